@@ -0,0 +1,97 @@
+""" Time building binary operations for long operator chains.
+
+Usage: python benchmarks/binary_operations.py [TERMS [REPEAT]]
+
+Builds the trees for a generated string concatenation and a mixed arithmetic
+expression of TERMS operands from their parsed parts, once with the precedence
+climbing build_binary_operation and once with the previous implementation,
+which sliced the list of parts and scanned it again for every precedence
+level.
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import parser, tokenizer, tree
+
+
+class LegacyBinaryOperationParser(parser.Parser):
+
+    def build_binary_operation(self, parts, start_level=0):
+        if len(parts) == 1:
+            return parts[0]
+
+        operands = list()
+        operators = list()
+
+        i = 0
+
+        for level in range(start_level, len(self.operator_precedence)):
+            for j in range(1, len(parts) - 1, 2):
+                if parts[j] in self.operator_precedence[level]:
+                    operand = self.build_binary_operation(parts[i:j], level + 1)
+                    operator = parts[j]
+                    i = j + 1
+
+                    operands.append(operand)
+                    operators.append(operator)
+
+            if operands:
+                break
+
+        operand = self.build_binary_operation(parts[i:], level + 1)
+        operands.append(operand)
+
+        operation = operands[0]
+
+        for operator, operandr in zip(operators, operands[1:]):
+            operation = tree.BinaryOperation(operandl=operation)
+            operation.operator = operator
+            operation.operandr = operandr
+
+        return operation
+
+
+def expressions(terms):
+    concatenation = ' + '.join('"part %d: " + value%d' % (n, n) for n in range(terms // 2))
+    operators = ['+', '*', '-', '/', '<<', '&', '|', '^', '%']
+    arithmetic = 'x0' + ''.join(' %s x%d' % (operators[n % len(operators)], n)
+                                for n in range(1, terms))
+
+    return [concatenation, arithmetic]
+
+
+def parts(expression):
+    """ The operands and operators of expression, as passed to
+    build_binary_operation by parse_expression_2 """
+
+    p = parser.Parser(tokenizer.tokenize(expression + ';'))
+    operand = p.parse_expression_3()
+
+    return [operand] + p.parse_expression_2_rest()
+
+
+def main(terms=200, repeat=5):
+    part_lists = [parts(expression) for expression in expressions(terms)]
+
+    def run(cls):
+        p = cls([])
+        return min(timeit.repeat(
+            lambda: [p.build_binary_operation(list(each)) for each in part_lists],
+            number=20, repeat=repeat)) / 20
+
+    legacy = run(LegacyBinaryOperationParser)
+    climbing = run(parser.Parser)
+
+    print('terms:             %d' % terms)
+    print('slicing:           %.2fms' % (legacy * 1000))
+    print('precedence climb:  %.2fms' % (climbing * 1000))
+    print('speedup:           %.2fx' % (legacy / climbing))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,132 @@
+""" Time literal scanning on data heavy code.
+
+Usage: python benchmarks/literal_scanning.py [REPEAT]
+
+Tokenizes generated constant tables and long string literals with the per
+character tokenizer, once using the regex based read_string and read_digits
+and once using the previous implementations, which stepped through literals
+one character at a time.
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import tokenizer
+
+
+CONSTANTS = """
+    static final long[] TABLE_%(n)d = {
+        0x%(n)08XL, 0xFFFF_FFFFL, 1_000_000L, 0b1010_1010, 017777, 123456789,
+        3.14159265358979, 2.718281828e-10, 0x1.fffffeP+127f, 6.02214076e23d,
+    };
+"""
+
+STRINGS = """
+    static final String MESSAGE_%(n)d = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.\\n";
+    static final String ESCAPED_%(n)d = "tab\\there \\"quoted\\" \\\\ octal \\101\\102 unicode-free text that goes on for a while";
+    static final char C_%(n)d = '\\'';
+"""
+
+
+class LegacyLiteralTokenizer(tokenizer.JavaTokenizer):
+
+    def read_string(self):
+        delim = self.data[self.i]
+
+        state = 0
+        j = self.i + 1
+        length = self.length
+
+        while True:
+            if j >= length:
+                self.error('unterminated_literal')
+                break
+
+            if state == 0:
+                if self.data[j] == '\\':
+                    state = 1
+                elif self.data[j] == delim:
+                    break
+
+            elif state == 1:
+                if self.data[j] in 'btnfru"\'\\':
+                    state = 0
+                elif self.data[j] in '0123':
+                    state = 2
+                elif self.data[j] in '01234567':
+                    state = 3
+                else:
+                    self.error('illegal_escape', self.data[j])
+
+            elif state == 2:
+                if self.data[j] in '01234567':
+                    state = 3
+                elif self.data[j] == '\\':
+                    state = 1
+                elif self.data[j] == delim:
+                    break
+
+            elif state == 3:
+                state = 0
+
+                if self.data[j] == '\\':
+                    state = 1
+                elif self.data[j] == delim:
+                    break
+
+            j += 1
+
+        self.j = j + 1
+
+    def read_digits(self, digits):
+        tmp_i = 0
+        c = None
+
+        while self.j + tmp_i < len(self.data):
+            c = self.data[self.j + tmp_i]
+
+            if c in digits:
+                self.j += 1 + tmp_i
+                tmp_i = 0
+            elif c == '_':
+                tmp_i += 1
+            else:
+                break
+
+        if c in 'lL':
+            self.j += 1
+
+
+def corpus(size=300):
+    members = []
+    for n in range(size):
+        members.append(CONSTANTS % {'n': n})
+        members.append(STRINGS % {'n': n})
+
+    return 'class Literals {\n%s}\n' % ''.join(members)
+
+
+def main(repeat=5):
+    source = corpus()
+    literals = sum(1 for t in tokenizer.tokenize(source)
+                   if isinstance(t, tokenizer.Literal))
+
+    def run(cls):
+        return min(timeit.repeat(lambda: list(cls(source).tokenize()),
+                                 number=1, repeat=repeat))
+
+    legacy = run(LegacyLiteralTokenizer)
+    regex = run(tokenizer.JavaTokenizer)
+
+    print('source:            %d bytes, %d literals' % (len(source), literals))
+    print('per character:     %.3fs' % legacy)
+    print('regex:             %.3fs' % regex)
+    print('speedup:           %.2fx' % (legacy / regex))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,89 @@
+""" Time operator matching on operator heavy code.
+
+Usage: python benchmarks/operator_dispatch.py [REPEAT]
+
+Tokenizes generated bit-twiddling and stream/lambda code with the per
+character tokenizer, once using the first character dispatch table of
+try_operator and once using the previous implementation, which probed a set
+of operators of each length with a slice of the input.
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import tokenizer
+
+
+BIT_TWIDDLING = """
+    static int mix%(n)d(int h, long k) {
+        h ^= (h >>> 20) ^ (h >>> 12);
+        h = h ^ (h >>> 7) ^ (h >>> 4);
+        k = ~k + (k << 21); k ^= k >>> 24; k += (k << 3) + (k << 8);
+        h |= (int) (k & 0xFFFFL) << 16; h &= ~(1 << %(n)d) | h >> 2;
+        return h != 0 && k >= 0 || h <= -1 ? h %% 31 * 17 - --h : ++h / 3;
+    }
+"""
+
+STREAMS = """
+    static List<String> names%(n)d(List<Person> people) {
+        return people.stream()
+            .filter(p -> p.age() >= 18 && p.age() <= 65 || !p.retired())
+            .map(p -> p.first() + " " + p.last())
+            .sorted(Comparator.comparing(String::length).thenComparing(s -> s))
+            .reduce((a, b) -> a.length() > b.length() ? a : b)
+            .map(Collections::singletonList).orElseGet(ArrayList::new);
+    }
+"""
+
+
+class LegacyOperatorTokenizer(tokenizer.JavaTokenizer):
+
+    def __init__(self, data, ignore_errors=False):
+        super(LegacyOperatorTokenizer, self).__init__(data, ignore_errors)
+
+        self.operators = [set() for i in range(0, tokenizer.Operator.MAX_LEN)]
+
+        for v in tokenizer.Operator.VALUES:
+            self.operators[len(v) - 1].add(v)
+
+    def try_operator(self):
+        for l in range(min(self.length - self.i, tokenizer.Operator.MAX_LEN), 0, -1):
+            if self.data[self.i:self.i + l] in self.operators[l - 1]:
+                self.j = self.i + l
+                return True
+        return False
+
+
+def corpus(size=200):
+    methods = []
+    for n in range(size):
+        methods.append(BIT_TWIDDLING % {'n': n % 32})
+        methods.append(STREAMS % {'n': n})
+
+    return 'class Operators {\n%s}\n' % ''.join(methods)
+
+
+def main(repeat=5):
+    source = corpus()
+    operators = sum(1 for t in tokenizer.tokenize(source)
+                    if isinstance(t, tokenizer.Operator))
+
+    def run(cls):
+        return min(timeit.repeat(lambda: list(cls(source).tokenize()),
+                                 number=1, repeat=repeat))
+
+    legacy = run(LegacyOperatorTokenizer)
+    table = run(tokenizer.JavaTokenizer)
+
+    print('source:            %d bytes, %d operators' % (len(source), operators))
+    print('sliced sets:       %.3fs' % legacy)
+    print('dispatch table:    %.3fs' % table)
+    print('speedup:           %.2fx' % (legacy / table))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
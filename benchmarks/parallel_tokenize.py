@@ -0,0 +1,59 @@
+""" Time tokenizing a large generated file in parallel.
+
+Usage: python benchmarks/parallel_tokenize.py [PROCESSES [REPEAT]]
+
+Tokenizes a generated source of several megabytes with tokenize() and with
+tokenize_parallel() on a pool of PROCESSES processes (by default one per
+CPU). The pool is created once, outside of the timings.
+
+"""
+
+import multiprocessing
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import tokenizer
+
+
+MEMBERS = """
+    /** Generated accessor %(n)d */
+    public static final String NAME_%(n)d = "name-%(n)d";
+    private int value%(n)d = 0x%(n)X + %(n)d * 31;
+
+    public int getValue%(n)d() { return value%(n)d >>> 2; } /* %(n)d */
+"""
+
+
+def corpus(size=40000):
+    members = [MEMBERS % {'n': n} for n in range(size)]
+    return 'class Generated {\n%s}\n' % ''.join(members)
+
+
+def main(processes=None, repeat=3):
+    source = corpus()
+    pool = multiprocessing.Pool(processes)
+
+    try:
+        def run(tokenize):
+            return min(timeit.repeat(lambda: list(tokenize(source)),
+                                     number=1, repeat=repeat))
+
+        sequential = run(tokenizer.tokenize)
+        parallel = run(lambda code: tokenizer.tokenize_parallel(code, pool=pool))
+    finally:
+        pool.close()
+        pool.join()
+
+    print('source:            %d bytes, %d chunks' % (
+        len(source), len(tokenizer.split_points(source, 1 << 18)) + 1))
+    print('processes:         %d' % (processes or multiprocessing.cpu_count()))
+    print('sequential:        %.3fs' % sequential)
+    print('parallel:          %.3fs' % parallel)
+    print('speedup:           %.2fx' % (sequential / parallel))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
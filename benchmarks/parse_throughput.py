@@ -0,0 +1,128 @@
+""" Measure parse throughput in megabytes of source per second.
+
+Usage: python benchmarks/parse_throughput.py [FILE_OR_DIRECTORY ...]
+
+Parses token lists with the Parser, whose hot rules match tokens with
+accept_value, accept_kind, try_accept_value and precompiled Matchers, and
+with a Parser where those fall back to the generic accept, would_accept and
+try_accept, which check the type of each argument on every call. Without
+arguments a generated source of typical application code is used.
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import parser, tokenizer
+
+
+CLASS = """
+package com.example.orders%(n)d;
+
+import java.util.*;
+import java.util.function.Function;
+
+/** Generated service %(n)d */
+public class OrderService%(n)d extends AbstractService implements Service {
+    private static final int LIMIT = %(n)d;
+    private final Map<String, List<Order>> orders = new HashMap<>();
+    private int[] counts = new int[16];
+
+    public OrderService%(n)d(Repository repository) {
+        super(repository);
+    }
+
+    @Override
+    public List<Order> find(String customer, int offset) throws ServiceException {
+        List<Order> result = new ArrayList<Order>();
+        for (Order order : orders.get(customer)) {
+            if (order.getTotal() > LIMIT && !order.isCancelled()) {
+                result.add(order);
+            } else if (offset-- <= 0) {
+                break;
+            }
+        }
+        try {
+            counts[result.size() %% counts.length] += 1;
+        } catch (ArrayIndexOutOfBoundsException e) {
+            throw new ServiceException("Bad count: " + e.getMessage(), e);
+        }
+        return result;
+    }
+
+    public Function<Order, String> describe() {
+        return order -> String.format("%%s (%%d)", order.getId(), (long) order.getTotal());
+    }
+}
+"""
+
+
+class GenericMatchingParser(parser.Parser):
+
+    def accept_value(self, value):
+        return self.accept(value)
+
+    def accept_kind(self, kind):
+        return self.accept(kind)
+
+    def would_accept_value(self, value):
+        return self.would_accept(value)
+
+    def try_accept_value(self, value):
+        return self.try_accept(value)
+
+    def would_match(self, matcher):
+        return self.would_accept(*matcher.accepts)
+
+    def try_match(self, matcher):
+        return self.try_accept(*matcher.accepts)
+
+
+def java_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith('.java'):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main(paths, repeat=5):
+    if paths:
+        sources = [tokenizer.read_file(path) for path in java_files(paths)]
+    else:
+        sources = [CLASS % {'n': n} for n in range(100)]
+
+    token_lists = []
+    size = 0
+    for source in sources:
+        tokens = list(tokenizer.tokenize(source))
+        try:
+            parser.Parser(tokens).parse()
+        except parser.JavaSyntaxError:
+            # Sources using syntax that is not supported yet are left out
+            continue
+        token_lists.append(tokens)
+        size += len(source.encode('utf-8'))
+
+    def run(cls):
+        return min(timeit.repeat(lambda: [cls(tokens).parse() for tokens in token_lists],
+                                 number=1, repeat=repeat))
+
+    generic = run(GenericMatchingParser)
+    specialised = run(parser.Parser)
+    megabytes = size / float(1 << 20)
+
+    print('source:            %d files, %.2f MB' % (len(token_lists), megabytes))
+    print('generic matching:  %.3fs, %.2f MB/s' % (generic, megabytes / generic))
+    print('specialised:       %.3fs, %.2f MB/s' % (specialised, megabytes / specialised))
+    print('speedup:           %.2fx' % (generic / specialised))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
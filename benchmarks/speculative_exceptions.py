@@ -0,0 +1,122 @@
+""" Count the syntax errors raised by speculative parses.
+
+Usage: python benchmarks/speculative_exceptions.py [FILE_OR_DIRECTORY ...]
+
+Parses each source once with the look ahead predicates that rule out
+speculative parses bound to fail, and once with the predicates always
+allowing the speculative parse. That was the previous behaviour, where every
+failed attempt raised a JavaSyntaxError that was caught to backtrack. Without
+arguments a generated source of typical application code is used.
+
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import parser, tokenizer
+
+
+METHODS = """
+    public List<OrderLine> process%(n)d(Order order, Map<String, Object> options) {
+        List<OrderLine> result = new ArrayList<>();
+        int total = 0;
+        customer = order.getCustomer();
+        LOG.debug("Processing order {}", order.getId());
+        for (OrderLine line : order.getLines()) {
+            BigDecimal price = (BigDecimal) options.get(line.getSku());
+            if (price != null && (line.getQuantity() * 2) > total) {
+                total += line.getQuantity();
+                result.add(line);
+            }
+        }
+        for (i = 0; i < result.size(); i++) {
+            counts[i] = (int) (total / (i + 1));
+        }
+        result.sort((a, b) -> a.getSku().compareTo(b.getSku()));
+        Collections.sort(result, (x) -> x.getQuantity());
+        this.cache.put(order.getId(), result);
+        return result;
+    }
+"""
+
+
+class CountingParser(parser.Parser):
+
+    def __init__(self, tokens):
+        super(CountingParser, self).__init__(tokens)
+        self.raised = 0
+
+    def illegal(self, description, at=None):
+        self.raised += 1
+        super(CountingParser, self).illegal(description, at)
+
+
+class AlwaysSpeculatingParser(CountingParser):
+
+    def may_be_local_variable_declaration(self, i=0):
+        return True
+
+    def may_be_lambda(self, i=0):
+        return True
+
+    def may_be_cast(self, i=0):
+        return True
+
+
+def java_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith('.java'):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def corpus(size=200):
+    methods = [METHODS % {'n': n} for n in range(size)]
+    return 'class OrderService {\n%s}\n' % ''.join(methods)
+
+
+def main(paths):
+    if paths:
+        sources = [tokenizer.read_file(path) for path in java_files(paths)]
+    else:
+        sources = [corpus()]
+
+    token_lists = []
+    for source in sources:
+        tokens = list(tokenizer.tokenize(source))
+        try:
+            parser.Parser(tokens).parse()
+        except parser.JavaSyntaxError:
+            # Sources using syntax that is not supported yet are left out
+            continue
+        token_lists.append(tokens)
+
+    def run(cls):
+        raised = 0
+        for tokens in token_lists:
+            p = cls(tokens)
+            p.parse()
+            raised += p.raised
+        return raised
+
+    def time(cls):
+        return min(timeit.repeat(lambda: run(cls), number=1, repeat=5))
+
+    count = float(len(token_lists))
+
+    print('files:             %d' % len(token_lists))
+    print('raised before:     %.1f per file' % (run(AlwaysSpeculatingParser) / count))
+    print('raised now:        %.1f per file' % (run(CountingParser) / count))
+    print('parse before:      %.3fs' % time(AlwaysSpeculatingParser))
+    print('parse now:         %.3fs' % time(CountingParser))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
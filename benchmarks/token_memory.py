@@ -0,0 +1,70 @@
+""" Measure the memory held per token by a fully materialised token stream.
+
+Usage: python benchmarks/token_memory.py [FILE_OR_DIRECTORY ...]
+
+The slotted token classes are compared against equivalent tokens carrying an
+instance dictionary, which is how tokens were represented before they gained
+__slots__. Without arguments the Java sources under javalang/test are used.
+
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from javalang import tokenizer
+
+
+class DictToken(object):
+    def __init__(self, value, position=None, javadoc=None):
+        self.value = value
+        self.position = position
+        self.javadoc = javadoc
+
+
+def java_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith('.java'):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def measure(sources, convert):
+    """ Bytes allocated per token for the token lists of all sources """
+
+    tracemalloc.start()
+    token_lists = [convert(tokenizer.tokenize(source)) for source in sources]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = sum(len(tokens) for tokens in token_lists)
+    return count, allocated / float(count)
+
+
+def main(paths):
+    if not paths:
+        paths = [os.path.join(os.path.dirname(__file__), os.pardir, 'javalang', 'test')]
+
+    sources = []
+    for path in java_files(paths):
+        with open(path, 'rb') as f:
+            sources.append(tokenizer.JavaTokenizer(f.read()).decode_data())
+
+    count, dict_size = measure(sources, lambda tokens: [
+        DictToken(t.value, t.position, t.javadoc) for t in tokens])
+    _, slot_size = measure(sources, list)
+
+    print('files:             %d' % len(sources))
+    print('tokens:            %d' % count)
+    print('dict tokens:       %.1f bytes/token' % dict_size)
+    print('slotted tokens:    %.1f bytes/token' % slot_size)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -1,9 +1,9 @@
 
+__version__ = "0.13.0"
+
 from . import parser
 from . import parse
 from . import tokenizer
 from . import javadoc
 from . import unparse
-
-
-__version__ = "0.13.0"
+from . import cache
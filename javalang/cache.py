@@ -0,0 +1,296 @@
+""" Caching of token streams across tokenizer runs.
+
+Token streams are stored under a key derived from a hash of the source and
+the javalang version, so unchanged sources are not lexed again. Two backends
+are provided: LRUCache keeps token lists in memory and DiskCache keeps them in
+a directory, in a compact binary format, so they can be shared between
+processes and runs. Any object with get(key) and set(key, tokens) methods can
+be used as a backend.
+
+"""
+
+import array
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from collections import OrderedDict
+
+import six
+
+from . import __version__
+from . import tokenizer
+
+
+if hasattr(hashlib, 'blake2b'):
+    def _hash(data):
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+else:
+    def _hash(data):
+        return hashlib.md5(data).hexdigest()
+
+if six.PY2:
+    _ENCODE_ERRORS = 'strict'
+else:
+    # Sources may contain lone surrogates
+    _ENCODE_ERRORS = 'surrogatepass'
+
+def _encode(text):
+    return text.encode('utf-8', _ENCODE_ERRORS)
+
+def _decode(data):
+    return data.decode('utf-8', _ENCODE_ERRORS)
+
+def cache_key(code, ignore_errors=False):
+    """ The key under which the tokens of code are cached """
+
+    if isinstance(code, six.text_type):
+        code = _encode(code)
+
+    return '%s-%s%s' % (__version__, _hash(code), '-i' if ignore_errors else '')
+
+class LRUCache(object):
+    """ Keeps the token lists of the maxsize most recently used sources in
+    memory. Tokens are shared between the lists returned for a source. The
+    parser doesn't modify the tokens it is given, so the lists can be parsed
+    any number of times, but other code modifying tokens should copy them.
+
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        tokens = self.entries.pop(key, None)
+
+        if tokens is None:
+            return None
+
+        self.entries[key] = tokens
+
+        return list(tokens)
+
+    def set(self, key, tokens):
+        self.entries.pop(key, None)
+        self.entries[key] = tuple(tokens)
+
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+# Header of an encoded token list: a magic number and format version followed
+# by the number of tokens and of javadoc comments.
+MAGIC = b'JLTC\x02'
+HEADER = struct.Struct('<5sII')
+
+def _array_bytes(a):
+    if sys.byteorder == 'big':
+        a = array.array(a.typecode, a)
+        a.byteswap()
+
+    if six.PY2:
+        return a.tostring()
+
+    return a.tobytes()
+
+def _read_array(typecode, data, offset, count):
+    a = array.array(typecode)
+    end = offset + a.itemsize * count
+
+    if six.PY2:
+        a.fromstring(data[offset:end])
+    else:
+        a.frombytes(data[offset:end])
+
+    if sys.byteorder == 'big':
+        a.byteswap()
+
+    return a, end
+
+def encode_tokens(tokens):
+    """ Encode a list of tokens as bytes.
+
+    Tokens are stored column-wise: their kinds, offsets, lines, columns and
+    the lengths of their values as arrays, followed by the values and javadoc
+    comments as a single string each.
+
+    """
+
+    kinds = array.array('H')
+    offsets = array.array('i')
+    lines = array.array('i')
+    columns = array.array('i')
+    lengths = array.array('i')
+    values = []
+
+    javadoc_indexes = array.array('i')
+    javadoc_lengths = array.array('i')
+    javadocs = []
+
+    for index, token in enumerate(tokens):
+        line, column = token.position
+
+        kinds.append(token.kind)
+        offsets.append(token.offset)
+        lines.append(line)
+        columns.append(column)
+        lengths.append(len(token.value))
+        values.append(token.value)
+
+        if token.javadoc is not None:
+            # Javadoc comments kept as spans are stored as text
+            javadoc = six.text_type(token.javadoc)
+
+            javadoc_indexes.append(index)
+            javadoc_lengths.append(len(javadoc))
+            javadocs.append(javadoc)
+
+    values = _encode(u''.join(values))
+    javadocs = _encode(u''.join(javadocs))
+
+    parts = [HEADER.pack(MAGIC, len(kinds), len(javadoc_indexes))]
+    parts.extend(_array_bytes(a) for a in (kinds, offsets, lines, columns, lengths,
+                                           javadoc_indexes, javadoc_lengths))
+    parts.append(struct.pack('<I', len(values)))
+    parts.append(values)
+    parts.append(javadocs)
+
+    return b''.join(parts)
+
+def decode_tokens(data):
+    """ Decode a list of tokens encoded by encode_tokens. Raises ValueError if
+    data is not an encoded token list.
+
+    """
+
+    if len(data) < HEADER.size:
+        raise ValueError('Truncated token list')
+
+    magic, count, javadoc_count = HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise ValueError('Not an encoded token list')
+
+    offset = HEADER.size
+    kinds, offset = _read_array('H', data, offset, count)
+    offsets, offset = _read_array('i', data, offset, count)
+    lines, offset = _read_array('i', data, offset, count)
+    columns, offset = _read_array('i', data, offset, count)
+    lengths, offset = _read_array('i', data, offset, count)
+    javadoc_indexes, offset = _read_array('i', data, offset, javadoc_count)
+    javadoc_lengths, offset = _read_array('i', data, offset, javadoc_count)
+
+    if len(data) < offset + 4:
+        raise ValueError('Truncated token list')
+
+    values_size, = struct.unpack_from('<I', data, offset)
+    offset += 4
+
+    if len(data) < offset + values_size:
+        raise ValueError('Truncated token list')
+
+    values = _decode(data[offset:offset + values_size])
+    javadocs = _decode(data[offset + values_size:])
+
+    javadoc_by_index = {}
+    start = 0
+    for index, length in zip(javadoc_indexes, javadoc_lengths):
+        javadoc_by_index[index] = javadocs[start:start + length]
+        start += length
+
+    token_kinds = tokenizer.TOKEN_KINDS
+    Position = tokenizer.Position
+
+    tokens = []
+    start = 0
+    for index in range(count):
+        end = start + lengths[index]
+        tokens.append(token_kinds[kinds[index]](
+            values[start:end], Position(lines[index], columns[index]),
+            javadoc_by_index.get(index), offsets[index]))
+        start = end
+
+    if start != len(values) or len(javadocs) != sum(javadoc_lengths):
+        raise ValueError('Truncated token list')
+
+    return tokens
+
+# Python 2 has no os.replace, os.rename replaces files on POSIX systems only
+_replace = getattr(os, 'replace', os.rename)
+
+class DiskCache(object):
+    """ Keeps token lists in files under directory, one per source, encoded
+    by encode_tokens. Files are replaced atomically, so a directory can be
+    shared by concurrent processes.
+
+    """
+
+    SUFFIX = '.tokens'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key):
+        try:
+            with open(self.path(key), 'rb') as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+
+        try:
+            return decode_tokens(data)
+        except (ValueError, IndexError, UnicodeDecodeError, struct.error):
+            # A corrupt entry is treated as missing and replaced by the next set
+            return None
+
+    def set(self, key, tokens):
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encode_tokens(tokens))
+
+            _replace(temp_path, self.path(key))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                os.remove(os.path.join(self.directory, name))
+
+def tokenize(code, cache, ignore_errors=False, regex=False):
+    """ Tokenize code into a list of tokens, using the tokens stored in cache
+    if code has been tokenized before.
+
+    Unlike tokenizer.tokenize, errors found while ignoring errors are not
+    available for cached sources, and a source with errors is not cached
+    unless ignore_errors is true.
+
+    """
+
+    key = cache_key(code, ignore_errors)
+    tokens = cache.get(key)
+
+    if tokens is None:
+        tokens = list(tokenizer.tokenize(code, ignore_errors, regex))
+        cache.set(key, tokens)
+
+    return tokens
+
+def tokenize_file(path, cache, ignore_errors=False, regex=False, encoding=None):
+    return tokenize(tokenizer.read_file(path, encoding), cache, ignore_errors, regex)
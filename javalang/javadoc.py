@@ -93,6 +93,9 @@ def _force_blocks_left(s):
     return blocks_justify_re.sub('@', s)
 
 def parse(raw):
+    # Comments kept as a JavadocSpan by the tokenizer are parsed from their text
+    raw = getattr(raw, 'text', raw)
+
     sanitized = _sanitize(raw)
     uncommented = _uncomment(sanitized)
     justified = _left_justify(uncommented)
@@ -1,6 +1,6 @@
 
 from .parser import Parser
-from .tokenizer import tokenize
+from .tokenizer import tokenize, tokenize_file
 
 def parse_expression(exp):
     if not exp.endswith(';'):
@@ -47,7 +47,12 @@ def parse_type_signature(sig):
 
     return parser.parse_class_or_interface_declaration()
 
-def parse(s):
-    tokens = tokenize(s)
+def parse(s, lazy_javadoc=False):
+    tokens = tokenize(s, lazy_javadoc=lazy_javadoc)
+    parser = Parser(tokens)
+    return parser.parse()
+
+def parse_file(path, encoding=None, lazy_javadoc=False):
+    tokens = tokenize_file(path, encoding=encoding, lazy_javadoc=lazy_javadoc)
     parser = Parser(tokens)
     return parser.parse()
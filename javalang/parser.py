@@ -76,6 +76,52 @@ class JavaSyntaxError(JavaParserBaseException):
 class JavaParserError(JavaParserBaseException):
     pass
 
+# ------------------------------------------------------------------------------
+# ---- Token matchers ----
+
+class Matcher(object):
+    """ A sequence of token values and token classes, as passed to
+    Parser.would_accept, sorted out once for Parser.would_match and
+    Parser.try_match rather than on every call.
+
+    """
+
+    def __init__(self, *accepts):
+        if len(accepts) == 0:
+            raise JavaParserError("Missing acceptable values")
+
+        self.accepts = accepts
+        self.checks = tuple((i, accept, isinstance(accept, type))
+                            for i, accept in enumerate(accepts))
+
+    def __len__(self):
+        return len(self.accepts)
+
+DOT_IDENTIFIER = Matcher('.', Identifier)
+LABEL = Matcher(Identifier, ':')
+DIMENSION = Matcher('[', ']')
+DOT_CLASS = Matcher('.', 'class')
+DOT_THIS = Matcher('.', 'this')
+DOT_TYPE_ARGUMENTS = Matcher('.', '<')
+DOT_NEW = Matcher('.', 'new')
+DOT_SUPER_CALL = Matcher('.', 'super', '(')
+
+# ------------------------------------------------------------------------------
+# ---- Parser tokens ----
+
+class SuperQualifier(Keyword):
+    """ The 'super' qualifying a method reference ('super::m'), which the
+    parser returns as an expression with the attributes of a primary. It is a
+    copy of the token read, as tokens may be shared between parses.
+
+    """
+
+    __slots__ = ('prefix_operators', 'selectors', 'postfix_operators')
+
+    @classmethod
+    def copy(cls, token):
+        return cls(token.value, token._position, token.javadoc, token.offset)
+
 # ------------------------------------------------------------------------------
 # ---- Parser class ----
 
@@ -91,6 +137,20 @@ class Parser(object):
                             set(('+', '-')),
                             set(('*', '/', '%')) ]
 
+    # The precedence level of each operator, see build_binary_operation
+    operator_levels = dict((operator, level)
+                           for level, operators in enumerate(operator_precedence)
+                           for operator in operators)
+
+    # Values of the tokens, other than identifiers and basic types, a type is
+    # made of, and those lambda parameters are made of in addition
+    type_values = set(('.', ',', '<', '>', '?', 'extends', 'super', '[', ']'))
+    lambda_parameter_values = type_values | set(('...', 'final'))
+
+    # Values of the tokens, other than literals, identifiers and basic types, an
+    # expression operand can start with
+    operand_values = set(('(', '<', 'this', 'super', 'new', 'void')) | Operator.PREFIX
+
     def __init__(self, tokens):
         self.tokens = util.LookAheadListIterator(tokens)
         self.tokens.set_default(EndOfInput(None))
@@ -169,39 +229,89 @@ class Parser(object):
 
         return True
 
-    def build_binary_operation(self, parts, start_level=0):
-        if len(parts) == 1:
-            return parts[0]
+    # Specialised forms of the methods above for the hot rules. They take a
+    # single token value or class, or a precompiled Matcher, so they neither
+    # build an argument tuple nor check the type of what they match.
 
-        operands = list()
-        operators = list()
+    def accept_value(self, value):
+        token = next(self.tokens)
 
-        i = 0
+        if token.value != value:
+            self.illegal("Expected '%s'" % (value,))
 
-        for level in range(start_level, len(self.operator_precedence)):
-            for j in range(1, len(parts) - 1, 2):
-                if parts[j] in self.operator_precedence[level]:
-                    operand = self.build_binary_operation(parts[i:j], level + 1)
-                    operator = parts[j]
-                    i = j + 1
+        return value
 
-                    operands.append(operand)
-                    operators.append(operator)
+    def accept_kind(self, kind):
+        token = next(self.tokens)
 
-            if operands:
-                break
+        if not isinstance(token, kind):
+            self.illegal("Expected %s" % (kind.__name__,))
+
+        return token.value
+
+    def would_accept_value(self, value):
+        return self.tokens.look().value == value
+
+    def try_accept_value(self, value):
+        if self.tokens.look().value == value:
+            next(self.tokens)
+            return True
+
+        return False
+
+    def would_match(self, matcher):
+        look = self.tokens.look
 
-        operand = self.build_binary_operation(parts[i:], level + 1)
-        operands.append(operand)
+        for i, accept, is_kind in matcher.checks:
+            if is_kind:
+                if not isinstance(look(i), accept):
+                    return False
+            elif look(i).value != accept:
+                return False
+
+        return True
+
+    def try_match(self, matcher):
+        if not self.would_match(matcher):
+            return False
+
+        for _ in matcher.accepts:
+            next(self.tokens)
+
+        return True
+
+    def build_binary_operation(self, parts):
+        """ Build the tree of left associative binary operations for a list of
+        operands separated by infix operators, in a single pass by precedence
+        climbing on an operand and an operator stack
+
+        """
+
+        levels = self.operator_levels
+        operands = [parts[0]]
+        operators = list()
+
+        def combine():
+            operandr = operands.pop()
+            operation = tree.BinaryOperation(operator=operators.pop(),
+                                             operandl=operands.pop(),
+                                             operandr=operandr)
+            operands.append(operation)
 
-        operation = operands[0]
+        for j in range(1, len(parts), 2):
+            operator = parts[j]
+            level = levels[operator]
 
-        for operator, operandr in zip(operators, operands[1:]):
-            operation = tree.BinaryOperation(operandl=operation)
-            operation.operator = operator
-            operation.operandr = operandr
+            while operators and levels[operators[-1]] >= level:
+                combine()
 
-        return operation
+            operators.append(operator)
+            operands.append(parts[j + 1])
+
+        while operators:
+            combine()
+
+        return operands[0]
 
     def is_annotation(self, i=0):
         """ Returns true if the position is the start of an annotation application
@@ -221,6 +331,95 @@ class Parser(object):
         return (isinstance(self.tokens.look(i), Annotation)
                 and self.tokens.look(i + 1).value == 'interface')
 
+    # The following predicates look ahead to rule out a speculative parse that
+    # is bound to fail, which is much cheaper than raising and catching the
+    # JavaSyntaxError. They return true if the parse may succeed.
+
+    def may_be_local_variable_declaration(self, i=0):
+        """ Returns false if the position cannot be the start of a local
+        variable declaration, i.e. a type followed by an identifier. Types with
+        type arguments are not looked into.
+
+        """
+
+        token = self.tokens.look(i)
+
+        if isinstance(token, (BasicType, Modifier, Annotation)):
+            return True
+
+        while True:
+            if not isinstance(token, Identifier):
+                return False
+
+            token = self.tokens.look(i + 1)
+            if token.value == '<':
+                return True
+            elif token.value != '.':
+                break
+
+            i += 2
+            token = self.tokens.look(i)
+
+        i += 1
+        while self.tokens.look(i).value == '[' and self.tokens.look(i + 1).value == ']':
+            i += 2
+
+        return isinstance(self.tokens.look(i), Identifier)
+
+    def may_be_lambda(self, i=0):
+        """ Returns false if the parenthesis at the position cannot start the
+        parameters of a lambda expression parsed by parse_lambda_expression()
+
+        """
+
+        j = i + 1
+
+        if (isinstance(self.tokens.look(j), Identifier)
+                and self.tokens.look(j + 1).value == ')'):
+            # A single inferred parameter is parsed as a parenthesized expression
+            return False
+
+        while True:
+            token = self.tokens.look(j)
+
+            if isinstance(token, Annotation):
+                return True
+            elif not (isinstance(token, (Identifier, BasicType))
+                      or token.value in self.lambda_parameter_values):
+                break
+
+            j += 1
+
+        return token.value == ')' and self.tokens.look(j + 1).value == '->'
+
+    def may_be_cast(self, i=0):
+        """ Returns false if the parenthesis at the position cannot start a cast,
+        i.e. a parenthesized type followed by an operand
+
+        """
+
+        j = i + 1
+
+        if not isinstance(self.tokens.look(j), (Identifier, BasicType)):
+            return False
+
+        while True:
+            token = self.tokens.look(j)
+
+            if not (isinstance(token, (Identifier, BasicType))
+                    or token.value in self.type_values):
+                break
+
+            j += 1
+
+        if token.value != ')':
+            return False
+
+        token = self.tokens.look(j + 1)
+
+        return (isinstance(token, (Literal, Identifier, BasicType))
+                or token.value in self.operand_values)
+
 # ------------------------------------------------------------------------------
 # ---- Parsing methods ----
 
@@ -229,7 +428,7 @@ class Parser(object):
 
     @parse_debug
     def parse_identifier(self):
-        return self.accept(Identifier)
+        return self.accept_kind(Identifier)
 
     @parse_debug
     def parse_qualified_identifier(self):
@@ -239,7 +438,7 @@ class Parser(object):
             identifier = self.parse_identifier()
             qualified_identifier.append(identifier)
 
-            if not self.try_accept('.'):
+            if not self.try_accept_value('.'):
                 break
 
         return '.'.join(qualified_identifier)
@@ -252,7 +451,7 @@ class Parser(object):
             qualified_identifier = self.parse_qualified_identifier()
             qualified_identifiers.append(qualified_identifier)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
         return qualified_identifiers
@@ -276,7 +475,7 @@ class Parser(object):
         if self.is_annotation():
             package_annotations = self.parse_annotations()
 
-        if self.try_accept('package'):
+        if self.try_accept_value('package'):
             self.tokens.pop_marker(False)
             
             token = self.tokens.look()
@@ -286,12 +485,12 @@ class Parser(object):
                                               documentation=javadoc)
             package._position = token.position
             
-            self.accept(';')
+            self.accept_value(';')
         else:
             self.tokens.pop_marker(True)
             package_annotations = None
 
-        while self.would_accept('import'):
+        while self.would_accept_value('import'):
             token = self.tokens.look()
             import_declaration = self.parse_import_declaration()
             import_declaration._position = token.position
@@ -316,23 +515,23 @@ class Parser(object):
         static = False
         import_all = False
 
-        self.accept('import')
+        self.accept_value('import')
 
-        if self.try_accept('static'):
+        if self.try_accept_value('static'):
             static = True
 
         while True:
             identifier = self.parse_identifier()
             qualified_identifier.append(identifier)
 
-            if self.try_accept('.'):
-                if self.try_accept('*'):
-                    self.accept(';')
+            if self.try_accept_value('.'):
+                if self.try_accept_value('*'):
+                    self.accept_value(';')
                     import_all = True
                     break
 
             else:
-                self.accept(';')
+                self.accept_value(';')
                 break
 
         return tree.Import(path='.'.join(qualified_identifier),
@@ -341,7 +540,7 @@ class Parser(object):
 
     @parse_debug
     def parse_type_declaration(self):
-        if self.try_accept(';'):
+        if self.try_accept_value(';'):
             return None
         else:
             return self.parse_class_or_interface_declaration()
@@ -378,17 +577,17 @@ class Parser(object):
         implements = None
         body = None
 
-        self.accept('class')
+        self.accept_value('class')
 
         name = self.parse_identifier()
 
-        if self.would_accept('<'):
+        if self.would_accept_value('<'):
             type_params = self.parse_type_parameters()
 
-        if self.try_accept('extends'):
+        if self.try_accept_value('extends'):
             extends = self.parse_type()
 
-        if self.try_accept('implements'):
+        if self.try_accept_value('implements'):
             implements = self.parse_type_list()
 
         body = self.parse_class_body()
@@ -405,10 +604,10 @@ class Parser(object):
         implements = None
         body = None
 
-        self.accept('enum')
+        self.accept_value('enum')
         name = self.parse_identifier()
 
-        if self.try_accept('implements'):
+        if self.try_accept_value('implements'):
             implements = self.parse_type_list()
 
         body = self.parse_enum_body()
@@ -424,13 +623,13 @@ class Parser(object):
         extends = None
         body = None
 
-        self.accept('interface')
+        self.accept_value('interface')
         name = self.parse_identifier()
 
-        if self.would_accept('<'):
+        if self.would_accept_value('<'):
             type_parameters = self.parse_type_parameters()
 
-        if self.try_accept('extends'):
+        if self.try_accept_value('extends'):
             extends = self.parse_type_list()
 
         body = self.parse_interface_body()
@@ -473,7 +672,7 @@ class Parser(object):
 
     @parse_debug
     def parse_basic_type(self):
-        return tree.BasicType(name=self.accept(BasicType))
+        return tree.BasicType(name=self.accept_kind(BasicType))
 
     @parse_debug
     def parse_reference_type(self):
@@ -483,10 +682,10 @@ class Parser(object):
         while True:
             tail.name = self.parse_identifier()
 
-            if self.would_accept('<'):
+            if self.would_accept_value('<'):
                 tail.arguments = self.parse_type_arguments()
 
-            if self.try_accept('.'):
+            if self.try_accept_value('.'):
                 tail.sub_type = tree.ReferenceType()
                 tail = tail.sub_type
             else:
@@ -498,16 +697,16 @@ class Parser(object):
     def parse_type_arguments(self):
         type_arguments = list()
 
-        self.accept('<')
+        self.accept_value('<')
 
         while True:
             type_argument = self.parse_type_argument()
             type_arguments.append(type_argument)
 
-            if self.try_accept('>'):
+            if self.try_accept_value('>'):
                 break
 
-            self.accept(',')
+            self.accept_value(',')
 
         return type_arguments
 
@@ -516,13 +715,13 @@ class Parser(object):
         pattern_type = None
         base_type = None
 
-        if self.try_accept('?'):
+        if self.try_accept_value('?'):
             if self.tokens.look().value in ('extends', 'super'):
                 pattern_type = self.tokens.next().value
             else:
                 return tree.TypeArgument(pattern_type='?')
 
-        if self.would_accept(BasicType):
+        if isinstance(self.tokens.look(), BasicType):
             base_type = self.parse_basic_type()
             self.accept('[', ']')
             base_type.dimensions = [None]
@@ -537,9 +736,9 @@ class Parser(object):
 
     @parse_debug
     def parse_nonwildcard_type_arguments(self):
-        self.accept('<')
+        self.accept_value('<')
         type_arguments = self.parse_type_list()
-        self.accept('>')
+        self.accept_value('>')
 
         return [tree.TypeArgument(type=t) for t in type_arguments]
 
@@ -548,7 +747,7 @@ class Parser(object):
         types = list()
 
         while True:
-            if self.would_accept(BasicType):
+            if isinstance(self.tokens.look(), BasicType):
                 base_type = self.parse_basic_type()
                 self.accept('[', ']')
                 base_type.dimensions = [None]
@@ -559,7 +758,7 @@ class Parser(object):
             base_type.dimensions += self.parse_array_dimension()
             types.append(base_type)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
         return types
@@ -582,16 +781,16 @@ class Parser(object):
     def parse_type_parameters(self):
         type_parameters = list()
 
-        self.accept('<')
+        self.accept_value('<')
 
         while True:
             type_parameter = self.parse_type_parameter()
             type_parameters.append(type_parameter)
 
-            if self.try_accept('>'):
+            if self.try_accept_value('>'):
                 break
             else:
-                self.accept(',')
+                self.accept_value(',')
 
         return type_parameters
 
@@ -600,14 +799,14 @@ class Parser(object):
         identifier = self.parse_identifier()
         extends = None
 
-        if self.try_accept('extends'):
+        if self.try_accept_value('extends'):
             extends = list()
 
             while True:
                 reference_type = self.parse_reference_type()
                 extends.append(reference_type)
 
-                if not self.try_accept('&'):
+                if not self.try_accept_value('&'):
                     break
 
         return tree.TypeParameter(name=identifier,
@@ -617,7 +816,7 @@ class Parser(object):
     def parse_array_dimension(self):
         array_dimension = 0
 
-        while self.try_accept('[', ']'):
+        while self.try_match(DIMENSION):
             array_dimension += 1
 
         return [None] * array_dimension
@@ -637,8 +836,8 @@ class Parser(object):
 
         while True:
             token = self.tokens.look()
-            if self.would_accept(Modifier):
-                modifiers.add(self.accept(Modifier))
+            if isinstance(self.tokens.look(), Modifier):
+                modifiers.add(self.accept_kind(Modifier))
 
             elif self.is_annotation():
                 annotation = self.parse_annotation()
@@ -671,13 +870,13 @@ class Parser(object):
         qualified_identifier = None
         annotation_element = None
 
-        self.accept('@')
+        self.accept_value('@')
         qualified_identifier = self.parse_qualified_identifier()
 
-        if self.try_accept('('):
-            if not self.would_accept(')'):
+        if self.try_accept_value('('):
+            if not self.would_accept_value(')'):
                 annotation_element = self.parse_annotation_element()
-            self.accept(')')
+            self.accept_value(')')
 
         return tree.Annotation(name=qualified_identifier,
                                element=annotation_element)
@@ -699,7 +898,7 @@ class Parser(object):
             pair._position = token.position
             pairs.append(pair)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
         return pairs
@@ -707,7 +906,7 @@ class Parser(object):
     @parse_debug
     def parse_element_value_pair(self):
         identifier = self.parse_identifier()
-        self.accept('=')
+        self.accept_value('=')
         value = self.parse_element_value()
 
         return tree.ElementValuePair(name=identifier,
@@ -721,7 +920,7 @@ class Parser(object):
             annotation._position = token.position
             return annotation
 
-        elif self.would_accept('{'):
+        elif self.would_accept_value('{'):
             return self.parse_element_value_array_initializer()
 
         else:
@@ -729,14 +928,14 @@ class Parser(object):
 
     @parse_debug
     def parse_element_value_array_initializer(self):
-        self.accept('{')
+        self.accept_value('{')
 
-        if self.try_accept('}'):
+        if self.try_accept_value('}'):
             return list()
 
         element_values = self.parse_element_values()
-        self.try_accept(',')
-        self.accept('}')
+        self.try_accept_value(',')
+        self.accept_value('}')
 
         return tree.ElementArrayValue(values=element_values)
 
@@ -748,10 +947,10 @@ class Parser(object):
             element_value = self.parse_element_value()
             element_values.append(element_value)
 
-            if self.would_accept('}') or self.would_accept(',', '}'):
+            if self.would_accept_value('}') or self.would_accept(',', '}'):
                 break
 
-            self.accept(',')
+            self.accept_value(',')
 
         return element_values
 
@@ -762,14 +961,14 @@ class Parser(object):
     def parse_class_body(self):
         declarations = list()
 
-        self.accept('{')
+        self.accept_value('{')
 
-        while not self.would_accept('}'):
+        while not self.would_accept_value('}'):
             declaration = self.parse_class_body_declaration()
             if declaration:
                 declarations.append(declaration)
 
-        self.accept('}')
+        self.accept_value('}')
 
         return declarations
 
@@ -777,41 +976,40 @@ class Parser(object):
     def parse_class_body_declaration(self):
         token = self.tokens.look()
 
-        if self.try_accept(';'):
+        if token.value == ';':
+            next(self.tokens)
             return None
 
-        elif self.would_accept('static', '{'):
-            self.accept('static')
+        elif token.value == 'static' and self.tokens.look(1).value == '{':
+            next(self.tokens)
             return self.parse_block()
 
-        elif self.would_accept('{'):
+        elif token.value == '{':
             return self.parse_block()
 
         else:
             return self.parse_member_declaration()
 
+    # Members that start with a keyword or separator after their modifiers, by
+    # its value
+    member_parsers = {
+        'void': 'parse_void_method_declaration',
+        '<': 'parse_generic_method_or_constructor_declaration',
+        'class': 'parse_normal_class_declaration',
+        'enum': 'parse_enum_declaration',
+        'interface': 'parse_normal_interface_declaration',
+    }
+
     @parse_debug
     def parse_member_declaration(self):
         modifiers, annotations, javadoc = self.parse_modifiers()
         member = None
 
         token = self.tokens.look()
-        if self.try_accept('void'):
-            method_name = self.parse_identifier()
-            member = self.parse_void_method_declarator_rest()
-            member.name = method_name
-
-        elif token.value == '<':
-            member = self.parse_generic_method_or_constructor_declaration()
-
-        elif token.value == 'class':
-            member = self.parse_normal_class_declaration()
-
-        elif token.value == 'enum':
-            member = self.parse_enum_declaration()
+        method = self.member_parsers.get(token.value)
 
-        elif token.value == 'interface':
-            member = self.parse_normal_interface_declaration()
+        if method:
+            member = getattr(self, method)()
 
         elif self.is_annotation_declaration():
             member = self.parse_annotation_type_declaration()
@@ -831,6 +1029,15 @@ class Parser(object):
 
         return member
 
+    @parse_debug
+    def parse_void_method_declaration(self):
+        self.accept_value('void')
+        method_name = self.parse_identifier()
+        member = self.parse_void_method_declarator_rest()
+        member.name = method_name
+
+        return member
+
     @parse_debug
     def parse_method_or_field_declaraction(self):
         member_type = self.parse_type()
@@ -853,11 +1060,11 @@ class Parser(object):
     def parse_method_or_field_rest(self):
         token = self.tokens.look()
         
-        if self.would_accept('('):
+        if self.would_accept_value('('):
             return self.parse_method_declarator_rest()
         else:
             rest = self.parse_field_declarators_rest()
-            self.accept(';')
+            self.accept_value(';')
             return rest
 
     @parse_debug
@@ -866,7 +1073,7 @@ class Parser(object):
         declarators = [tree.VariableDeclarator(dimensions=array_dimension,
                                                initializer=initializer)]
 
-        while self.try_accept(','):
+        while self.try_accept_value(','):
             declarator = self.parse_variable_declarator()
             declarators.append(declarator)
 
@@ -879,13 +1086,13 @@ class Parser(object):
         throws = None
         body = None
 
-        if self.try_accept('throws'):
+        if self.try_accept_value('throws'):
             throws = self.parse_qualified_identifier_list()
 
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             body = self.parse_block()
         else:
-            self.accept(';')
+            self.accept_value(';')
 
         return tree.MethodDeclaration(parameters=formal_parameters,
                                      throws=throws,
@@ -898,13 +1105,13 @@ class Parser(object):
         throws = None
         body = None
 
-        if self.try_accept('throws'):
+        if self.try_accept_value('throws'):
             throws = self.parse_qualified_identifier_list()
 
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             body = self.parse_block()
         else:
-            self.accept(';')
+            self.accept_value(';')
 
         return tree.MethodDeclaration(parameters=formal_parameters,
                                       throws=throws,
@@ -916,7 +1123,7 @@ class Parser(object):
         throws = None
         body = None
 
-        if self.try_accept('throws'):
+        if self.try_accept_value('throws'):
             throws = self.parse_qualified_identifier_list()
 
         body = self.parse_block()
@@ -935,7 +1142,7 @@ class Parser(object):
             constructor_name = self.parse_identifier()
             method = self.parse_constructor_declarator_rest()
             method.name = constructor_name
-        elif self.try_accept('void'):
+        elif self.try_accept_value('void'):
             method_name = self.parse_identifier()
             method = self.parse_void_method_declarator_rest()
             method.name = method_name
@@ -961,19 +1168,19 @@ class Parser(object):
     def parse_interface_body(self):
         declarations = list()
 
-        self.accept('{')
-        while not self.would_accept('}'):
+        self.accept_value('{')
+        while not self.would_accept_value('}'):
             declaration = self.parse_interface_body_declaration()
 
             if declaration:
                 declarations.append(declaration)
-        self.accept('}')
+        self.accept_value('}')
 
         return declarations
 
     @parse_debug
     def parse_interface_body_declaration(self):
-        if self.try_accept(';'):
+        if self.try_accept_value(';'):
             return None
 
         modifiers, annotations, javadoc = self.parse_modifiers()
@@ -990,17 +1197,17 @@ class Parser(object):
         declaration = None
 
         token = self.tokens.look()
-        if self.would_accept('class'):
+        if self.would_accept_value('class'):
             declaration = self.parse_normal_class_declaration()
-        elif self.would_accept('interface'):
+        elif self.would_accept_value('interface'):
             declaration = self.parse_normal_interface_declaration()
-        elif self.would_accept('enum'):
+        elif self.would_accept_value('enum'):
             declaration = self.parse_enum_declaration()
         elif self.is_annotation_declaration():
             declaration = self.parse_annotation_type_declaration()
-        elif self.would_accept('<'):
+        elif self.would_accept_value('<'):
             declaration = self.parse_interface_generic_method_declarator()
-        elif self.try_accept('void'):
+        elif self.try_accept_value('void'):
             method_name = self.parse_identifier()
             declaration = self.parse_void_interface_method_declarator_rest()
             declaration.name = method_name
@@ -1031,11 +1238,11 @@ class Parser(object):
     def parse_interface_method_or_field_rest(self):
         rest = None
 
-        if self.would_accept('('):
+        if self.would_accept_value('('):
             rest = self.parse_interface_method_declarator_rest()
         else:
             rest = self.parse_constant_declarators_rest()
-            self.accept(';')
+            self.accept_value(';')
 
         return rest
 
@@ -1045,7 +1252,7 @@ class Parser(object):
         declarators = [tree.VariableDeclarator(dimensions=array_dimension,
                                                initializer=initializer)]
 
-        while self.try_accept(','):
+        while self.try_accept_value(','):
             declarator = self.parse_constant_declarator()
             declarators.append(declarator)
 
@@ -1054,7 +1261,7 @@ class Parser(object):
     @parse_debug
     def parse_constant_declarator_rest(self):
         array_dimension = self.parse_array_dimension()
-        self.accept('=')
+        self.accept_value('=')
         initializer = self.parse_variable_initializer()
 
         return (array_dimension, initializer)
@@ -1075,13 +1282,13 @@ class Parser(object):
         throws = None
         body = None
 
-        if self.try_accept('throws'):
+        if self.try_accept_value('throws'):
             throws = self.parse_qualified_identifier_list()
 
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             body = self.parse_block()
         else:
-            self.accept(';')
+            self.accept_value(';')
 
         return tree.MethodDeclaration(parameters=parameters,
                                       throws=throws,
@@ -1094,13 +1301,13 @@ class Parser(object):
         throws = None
         body = None
 
-        if self.try_accept('throws'):
+        if self.try_accept_value('throws'):
             throws = self.parse_qualified_identifier_list()
 
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             body = self.parse_block()
         else:
-            self.accept(';')
+            self.accept_value(';')
 
         return tree.MethodDeclaration(parameters=parameters,
                                       throws=throws,
@@ -1112,7 +1319,7 @@ class Parser(object):
         return_type = None
         method_name = None
 
-        if not self.try_accept('void'):
+        if not self.try_accept_value('void'):
             return_type = self.parse_type()
 
         method_name = self.parse_identifier()
@@ -1130,9 +1337,9 @@ class Parser(object):
     def parse_formal_parameters(self):
         formal_parameters = list()
 
-        self.accept('(')
+        self.accept_value('(')
 
-        if self.try_accept(')'):
+        if self.try_accept_value(')'):
             return formal_parameters
 
         while True:
@@ -1142,7 +1349,7 @@ class Parser(object):
             parameter_type = self.parse_type()
             varargs = False
 
-            if self.try_accept('...'):
+            if self.try_accept_value('...'):
                 varargs = True
 
             parameter_name = self.parse_identifier()
@@ -1161,10 +1368,10 @@ class Parser(object):
                 # varargs parameter must be the last
                 break
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
-        self.accept(')')
+        self.accept_value(')')
 
         return formal_parameters
 
@@ -1175,7 +1382,7 @@ class Parser(object):
 
         while True:
             token = self.tokens.look()
-            if self.try_accept('final'):
+            if self.try_accept_value('final'):
                 modifiers.add('final')
             elif self.is_annotation():
                 annotation = self.parse_annotation()
@@ -1194,7 +1401,7 @@ class Parser(object):
             declarator = self.parse_variable_declator()
             declarators.append(declarator)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
         return declarators
@@ -1207,7 +1414,7 @@ class Parser(object):
             declarator = self.parse_variable_declarator()
             declarators.append(declarator)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
         return declarators
@@ -1226,14 +1433,14 @@ class Parser(object):
         array_dimension = self.parse_array_dimension()
         initializer = None
 
-        if self.try_accept('='):
+        if self.try_accept_value('='):
             initializer = self.parse_variable_initializer()
 
         return (array_dimension, initializer)
 
     @parse_debug
     def parse_variable_initializer(self):
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             return self.parse_array_initializer()
         else:
             return self.parse_expression()
@@ -1242,23 +1449,23 @@ class Parser(object):
     def parse_array_initializer(self):
         array_initializer = tree.ArrayInitializer(initializers=list())
 
-        self.accept('{')
+        self.accept_value('{')
 
-        if self.try_accept(','):
-            self.accept('}')
+        if self.try_accept_value(','):
+            self.accept_value('}')
             return array_initializer
 
-        if self.try_accept('}'):
+        if self.try_accept_value('}'):
             return array_initializer
 
         while True:
             initializer = self.parse_variable_initializer()
             array_initializer.initializers.append(initializer)
 
-            if not self.would_accept('}'):
-                self.accept(',')
+            if not self.would_accept_value('}'):
+                self.accept_value(',')
 
-            if self.try_accept('}'):
+            if self.try_accept_value('}'):
                 return array_initializer
 
 # ------------------------------------------------------------------------------
@@ -1268,22 +1475,22 @@ class Parser(object):
     def parse_block(self):
         statements = list()
 
-        self.accept('{')
+        self.accept_value('{')
 
-        while not self.would_accept('}'):
+        while not self.would_accept_value('}'):
             statement = self.parse_block_statement()
             statements.append(statement)
-        self.accept('}')
+        self.accept_value('}')
 
         return statements
 
     @parse_debug
     def parse_block_statement(self):
-        if self.would_accept(Identifier, ':'):
+        if self.would_match(LABEL):
             # Labeled statement
             return self.parse_statement()
 
-        if self.would_accept('synchronized'):
+        if self.would_accept_value('synchronized'):
             return self.parse_statement()
 
         token = None
@@ -1338,6 +1545,9 @@ class Parser(object):
         if not isinstance(token, Identifier):
             return self.parse_statement()
 
+        if not self.may_be_local_variable_declaration(i):
+            return self.parse_statement()
+
         # We can't easily determine the statement type. Try parsing as a variable
         # declaration first and fall back to a statement
         try:
@@ -1353,7 +1563,7 @@ class Parser(object):
         modifiers, annotations = self.parse_variable_modifiers()
         java_type = self.parse_type()
         declarators = self.parse_variable_declarators()
-        self.accept(';')
+        self.accept_value(';')
 
         var = tree.LocalVariableDeclaration(modifiers=modifiers,
                                             annotations=annotations,
@@ -1361,189 +1571,208 @@ class Parser(object):
                                             declarators=declarators)
         return var
 
+    # Statements that start with a keyword or separator, by its value
+    statement_parsers = {
+        '{': 'parse_block_as_statement',
+        ';': 'parse_empty_statement',
+        'if': 'parse_if_statement',
+        'assert': 'parse_assert_statement',
+        'switch': 'parse_switch_statement',
+        'while': 'parse_while_statement',
+        'do': 'parse_do_statement',
+        'for': 'parse_for_statement',
+        'break': 'parse_break_statement',
+        'continue': 'parse_continue_statement',
+        'return': 'parse_return_statement',
+        'throw': 'parse_throw_statement',
+        'synchronized': 'parse_synchronized_statement',
+        'try': 'parse_try_statement',
+    }
+
     @parse_debug
     def parse_statement(self):
         token = self.tokens.look()
-        if self.would_accept('{'):
-            block = self.parse_block()
-            statement = tree.BlockStatement(statements=block)
-            statement._position = token.position
-            return statement
+        method = self.statement_parsers.get(token.value)
 
-        elif self.try_accept(';'):
-            statement = tree.Statement()
-            statement._position = token.position
-            return statement
+        if method:
+            statement = getattr(self, method)()
 
-        elif self.would_accept(Identifier, ':'):
+        elif self.would_match(LABEL):
             identifer = self.parse_identifier()
-            self.accept(':')
+            self.accept_value(':')
 
             statement = self.parse_statement()
             statement.label = identifer
-            statement._position = token.position
 
-            return statement
+        else:
+            expression = self.parse_expression()
+            self.accept_value(';')
+
+            statement = tree.StatementExpression(expression=expression)
 
-        elif self.try_accept('if'):
-            condition = self.parse_par_expression()
-            then = self.parse_statement()
-            else_statement = None
+        statement._position = token.position
+        return statement
 
-            if self.try_accept('else'):
-                else_statement = self.parse_statement()
+    @parse_debug
+    def parse_block_as_statement(self):
+        block = self.parse_block()
+        return tree.BlockStatement(statements=block)
 
-            statement = tree.IfStatement(condition=condition,
-                                    then_statement=then,
-                                    else_statement=else_statement)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_empty_statement(self):
+        self.accept_value(';')
+        return tree.Statement()
 
-        elif self.try_accept('assert'):
-            condition = self.parse_expression()
-            value = None
+    @parse_debug
+    def parse_if_statement(self):
+        self.accept_value('if')
+        condition = self.parse_par_expression()
+        then = self.parse_statement()
+        else_statement = None
 
-            if self.try_accept(':'):
-                value = self.parse_expression()
+        if self.try_accept_value('else'):
+            else_statement = self.parse_statement()
 
-            self.accept(';')
+        return tree.IfStatement(condition=condition,
+                                then_statement=then,
+                                else_statement=else_statement)
 
-            statement = tree.AssertStatement(condition=condition, value=value)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_assert_statement(self):
+        self.accept_value('assert')
+        condition = self.parse_expression()
+        value = None
 
-        elif self.try_accept('switch'):
-            switch_expression = self.parse_par_expression()
-            self.accept('{')
-            switch_block = self.parse_switch_block_statement_groups()
-            self.accept('}')
+        if self.try_accept_value(':'):
+            value = self.parse_expression()
 
-            statement = tree.SwitchStatement(expression=switch_expression, cases=switch_block)
-            statement._position = token.position
-            return statement
+        self.accept_value(';')
 
-        elif self.try_accept('while'):
-            condition = self.parse_par_expression()
-            action = self.parse_statement()
+        return tree.AssertStatement(condition=condition, value=value)
 
-            statement = tree.WhileStatement(condition=condition, body=action)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_switch_statement(self):
+        self.accept_value('switch')
+        switch_expression = self.parse_par_expression()
+        self.accept_value('{')
+        switch_block = self.parse_switch_block_statement_groups()
+        self.accept_value('}')
 
-        elif self.try_accept('do'):
-            action = self.parse_statement()
-            self.accept('while')
-            condition = self.parse_par_expression()
-            self.accept(';')
+        return tree.SwitchStatement(expression=switch_expression, cases=switch_block)
 
-            statement = tree.DoStatement(condition=condition, body=action)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_while_statement(self):
+        self.accept_value('while')
+        condition = self.parse_par_expression()
+        action = self.parse_statement()
 
-        elif self.try_accept('for'):
-            self.accept('(')
-            for_control = self.parse_for_control()
-            self.accept(')')
-            for_statement = self.parse_statement()
+        return tree.WhileStatement(condition=condition, body=action)
 
-            statement = tree.ForStatement(control=for_control, body=for_statement)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_do_statement(self):
+        self.accept_value('do')
+        action = self.parse_statement()
+        self.accept_value('while')
+        condition = self.parse_par_expression()
+        self.accept_value(';')
 
-        elif self.try_accept('break'):
-            label = None
+        return tree.DoStatement(condition=condition, body=action)
 
-            if self.would_accept(Identifier):
-                label = self.parse_identifier()
+    @parse_debug
+    def parse_for_statement(self):
+        self.accept('for', '(')
+        for_control = self.parse_for_control()
+        self.accept_value(')')
+        for_statement = self.parse_statement()
 
-            self.accept(';')
+        return tree.ForStatement(control=for_control, body=for_statement)
 
-            statement = tree.BreakStatement(goto=label)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_break_statement(self):
+        self.accept_value('break')
+        label = None
 
-        elif self.try_accept('continue'):
-            label = None
+        if isinstance(self.tokens.look(), Identifier):
+            label = self.parse_identifier()
 
-            if self.would_accept(Identifier):
-                label = self.parse_identifier()
+        self.accept_value(';')
 
-            self.accept(';')
+        return tree.BreakStatement(goto=label)
 
-            statement = tree.ContinueStatement(goto=label)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_continue_statement(self):
+        self.accept_value('continue')
+        label = None
 
-        elif self.try_accept('return'):
-            value = None
+        if isinstance(self.tokens.look(), Identifier):
+            label = self.parse_identifier()
 
-            if not self.would_accept(';'):
-                value = self.parse_expression()
+        self.accept_value(';')
 
-            self.accept(';')
+        return tree.ContinueStatement(goto=label)
 
-            statement = tree.ReturnStatement(expression=value)
-            statement._position = token.position
-            return statement
+    @parse_debug
+    def parse_return_statement(self):
+        self.accept_value('return')
+        value = None
 
-        elif self.try_accept('throw'):
+        if not self.would_accept_value(';'):
             value = self.parse_expression()
-            self.accept(';')
-
-            statement = tree.ThrowStatement(expression=value)
-            statement._position = token.position
-            return statement
 
-        elif self.try_accept('synchronized'):
-            lock = self.parse_par_expression()
-            block = self.parse_block()
+        self.accept_value(';')
 
-            statement = tree.SynchronizedStatement(lock=lock, block=block)
-            statement._position = token.position
-            return statement
+        return tree.ReturnStatement(expression=value)
 
-        elif self.try_accept('try'):
-            resource_specification = None
-            block = None
-            catches = None
-            finally_block = None
+    @parse_debug
+    def parse_throw_statement(self):
+        self.accept_value('throw')
+        value = self.parse_expression()
+        self.accept_value(';')
 
-            if self.would_accept('{'):
-                block = self.parse_block()
+        return tree.ThrowStatement(expression=value)
 
-                if self.would_accept('catch'):
-                    catches = self.parse_catches()
+    @parse_debug
+    def parse_synchronized_statement(self):
+        self.accept_value('synchronized')
+        lock = self.parse_par_expression()
+        block = self.parse_block()
 
-                if self.try_accept('finally'):
-                    finally_block = self.parse_block()
+        return tree.SynchronizedStatement(lock=lock, block=block)
 
-                if catches == None and finally_block == None:
-                    self.illegal("Expected catch/finally block")
+    @parse_debug
+    def parse_try_statement(self):
+        self.accept_value('try')
+        resource_specification = None
+        block = None
+        catches = None
+        finally_block = None
 
-            else:
-                resource_specification = self.parse_resource_specification()
-                block = self.parse_block()
+        if self.would_accept_value('{'):
+            block = self.parse_block()
 
-                if self.would_accept('catch'):
-                    catches = self.parse_catches()
+            if self.would_accept_value('catch'):
+                catches = self.parse_catches()
 
-                if self.try_accept('finally'):
-                    finally_block = self.parse_block()
+            if self.try_accept_value('finally'):
+                finally_block = self.parse_block()
 
-            statement = tree.TryStatement(resources=resource_specification,
-                                     block=block,
-                                     catches=catches,
-                                     finally_block=finally_block)
-            statement._position = token.position
-            return statement
+            if catches == None and finally_block == None:
+                self.illegal("Expected catch/finally block")
 
         else:
-            expression = self.parse_expression()
-            self.accept(';')
+            resource_specification = self.parse_resource_specification()
+            block = self.parse_block()
 
-            statement = tree.StatementExpression(expression=expression)
-            statement._position = token.position
-            return statement
+            if self.would_accept_value('catch'):
+                catches = self.parse_catches()
+
+            if self.try_accept_value('finally'):
+                finally_block = self.parse_block()
+
+        return tree.TryStatement(resources=resource_specification,
+                                 block=block,
+                                 catches=catches,
+                                 finally_block=finally_block)
 
 # ------------------------------------------------------------------------------
 # -- Try / catch --
@@ -1556,7 +1785,7 @@ class Parser(object):
             catch = self.parse_catch_clause()
             catches.append(catch)
 
-            if not self.would_accept('catch'):
+            if not self.would_accept_value('catch'):
                 break
 
         return catches
@@ -1572,11 +1801,11 @@ class Parser(object):
             catch_type = self.parse_qualified_identifier()
             catch_parameter.types.append(catch_type)
 
-            if not self.try_accept('|'):
+            if not self.try_accept_value('|'):
                 break
         catch_parameter.name = self.parse_identifier()
 
-        self.accept(')')
+        self.accept_value(')')
         block = self.parse_block()
 
         return tree.CatchClause(parameter=catch_parameter, block=block)
@@ -1585,16 +1814,16 @@ class Parser(object):
     def parse_resource_specification(self):
         resources = list()
 
-        self.accept('(')
+        self.accept_value('(')
 
         while True:
             resource = self.parse_resource()
             resources.append(resource)
 
-            if not self.would_accept(')'):
-                self.accept(';')
+            if not self.would_accept_value(')'):
+                self.accept_value(';')
 
-            if self.try_accept(')'):
+            if self.try_accept_value(')'):
                 break
 
         return resources
@@ -1606,7 +1835,7 @@ class Parser(object):
         reference_type.dimensions = self.parse_array_dimension()
         name = self.parse_identifier()
         reference_type.dimensions += self.parse_array_dimension()
-        self.accept('=')
+        self.accept_value('=')
         value = self.parse_expression()
 
         return tree.TryResource(modifiers=modifiers,
@@ -1638,7 +1867,7 @@ class Parser(object):
             case_value = None
 
             if case_type == 'case':
-                if self.would_accept(Identifier, ':'):
+                if self.would_match(LABEL):
                     case_value = self.parse_identifier()
                 else:
                     case_value = self.parse_expression()
@@ -1647,7 +1876,7 @@ class Parser(object):
             elif not case_type == 'default':
                 self.illegal("Expected switch case")
 
-            self.accept(':')
+            self.accept_value(':')
 
             if self.tokens.look().value not in ('case', 'default'):
                 break
@@ -1662,26 +1891,27 @@ class Parser(object):
     def parse_for_control(self):
         # Try for_var_control and fall back to normal three part for control
 
-        try:
-            with self.tokens:
-                return self.parse_for_var_control()
-        except JavaSyntaxError:
-            pass
+        if self.may_be_local_variable_declaration():
+            try:
+                with self.tokens:
+                    return self.parse_for_var_control()
+            except JavaSyntaxError:
+                pass
 
         init = None
-        if not self.would_accept(';'):
+        if not self.would_accept_value(';'):
             init = self.parse_for_init_or_update()
 
-        self.accept(';')
+        self.accept_value(';')
 
         condition = None
-        if not self.would_accept(';'):
+        if not self.would_accept_value(';'):
             condition = self.parse_expression()
 
-        self.accept(';')
+        self.accept_value(';')
 
         update = None
-        if not self.would_accept(')'):
+        if not self.would_accept_value(')'):
             update = self.parse_for_init_or_update()
 
         return tree.ForControl(init=init,
@@ -1715,24 +1945,24 @@ class Parser(object):
 
     @parse_debug
     def parse_for_var_control_rest(self):
-        if self.try_accept(':'):
+        if self.try_accept_value(':'):
             expression = self.parse_expression()
             return expression
 
         declarators = None
-        if not self.would_accept(';'):
+        if not self.would_accept_value(';'):
             declarators = self.parse_for_variable_declarator_rest()
         else:
             declarators = [tree.VariableDeclarator()]
-        self.accept(';')
+        self.accept_value(';')
 
         condition = None
-        if not self.would_accept(';'):
+        if not self.would_accept_value(';'):
             condition = self.parse_expression()
-        self.accept(';')
+        self.accept_value(';')
 
         update = None
-        if not self.would_accept(')'):
+        if not self.would_accept_value(')'):
             update = self.parse_for_init_or_update()
 
         return (declarators, condition, update)
@@ -1741,12 +1971,12 @@ class Parser(object):
     def parse_for_variable_declarator_rest(self):
         initializer = None
 
-        if self.try_accept('='):
+        if self.try_accept_value('='):
             initializer = self.parse_variable_initializer()
 
         declarators = [tree.VariableDeclarator(initializer=initializer)]
 
-        while self.try_accept(','):
+        while self.try_accept_value(','):
             declarator = self.parse_variable_declarator()
             declarators.append(declarator)
 
@@ -1760,7 +1990,7 @@ class Parser(object):
             expression = self.parse_expression()
             expressions.append(expression)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
         return expressions
@@ -1789,19 +2019,19 @@ class Parser(object):
         true_expression = None
         false_expression = None
 
-        if self.try_accept('?'):
+        if self.try_accept_value('?'):
             true_expression = self.parse_expression()
-            self.accept(':')
+            self.accept_value(':')
             false_expression = self.parse_expressionl()
 
             return tree.TernaryExpression(condition=expression_2,
                                           if_true=true_expression,
                                           if_false=false_expression)
-        if self.would_accept('->'):
+        if self.would_accept_value('->'):
             body = self.parse_lambda_method_body()
             return tree.LambdaExpression(parameters=[expression_2],
                                          body=body)
-        if self.try_accept('::'):
+        if self.try_accept_value('::'):
             method_reference, type_arguments = self.parse_method_reference()
             return tree.MethodReference(
                 expression=expression_2,
@@ -1826,7 +2056,7 @@ class Parser(object):
 
         token = self.tokens.look()
         while token.value in Operator.INFIX or token.value == 'instanceof':
-            if self.try_accept('instanceof'):
+            if self.try_accept_value('instanceof'):
                 comparison_type = self.parse_type()
                 parts.extend(('instanceof', comparison_type))
             else:
@@ -1847,25 +2077,28 @@ class Parser(object):
         while self.tokens.look().value in Operator.PREFIX:
             prefix_operators.append(self.tokens.next().value)
 
-        if self.would_accept('('):
-            try:
-                with self.tokens:
+        if self.would_accept_value('('):
+            if self.may_be_lambda():
+                try:
+                    with self.tokens:
                         lambda_exp = self.parse_lambda_expression()
                         if lambda_exp:
                             return lambda_exp
-            except JavaSyntaxError:
-                pass
-            try:
-                with self.tokens:
-                    self.accept('(')
-                    cast_target = self.parse_type()
-                    self.accept(')')
-                    expression = self.parse_expression_3()
+                except JavaSyntaxError:
+                    pass
 
-                    return tree.Cast(type=cast_target,
-                                     expression=expression)
-            except JavaSyntaxError:
-                pass
+            if self.may_be_cast():
+                try:
+                    with self.tokens:
+                        self.accept_value('(')
+                        cast_target = self.parse_type()
+                        self.accept_value(')')
+                        expression = self.parse_expression_3()
+
+                        return tree.Cast(type=cast_target,
+                                         expression=expression)
+                except JavaSyntaxError:
+                    pass
 
         primary = self.parse_primary()
         primary.prefix_operators = prefix_operators
@@ -1889,10 +2122,10 @@ class Parser(object):
     @parse_debug
     def parse_method_reference(self):
         type_arguments = list()
-        if self.would_accept('<'):
+        if self.would_accept_value('<'):
             type_arguments = self.parse_nonwildcard_type_arguments()
-        if self.would_accept('new'):
-            method_reference = tree.MemberReference(member=self.accept('new'))
+        if self.would_accept_value('new'):
+            method_reference = tree.MemberReference(member=self.accept_value('new'))
         else:
             method_reference = self.parse_expression()
         return method_reference, type_arguments
@@ -1902,13 +2135,13 @@ class Parser(object):
         lambda_expr = None
         parameters = None
         if self.would_accept('(', Identifier, ','):
-            self.accept('(')
+            self.accept_value('(')
             parameters = []
-            while not self.would_accept(')'):
+            while not self.would_accept_value(')'):
                 parameters.append(tree.InferredFormalParameter(
                     name=self.parse_identifier()))
-                self.try_accept(',')
-            self.accept(')')
+                self.try_accept_value(',')
+            self.accept_value(')')
         else:
             parameters = self.parse_formal_parameters()
         body = self.parse_lambda_method_body()
@@ -1917,23 +2150,23 @@ class Parser(object):
 
     @parse_debug
     def parse_lambda_method_body(self):
-        if self.accept('->'):
-            if self.would_accept('{'):
+        if self.accept_value('->'):
+            if self.would_accept_value('{'):
                 return self.parse_block()
             else:
                 return self.parse_expression()
 
     @parse_debug
     def parse_infix_operator(self):
-        operator = self.accept(Operator)
+        operator = self.accept_kind(Operator)
 
         if not operator in Operator.INFIX:
             self.illegal("Expected infix operator")
 
-        if operator == '>' and self.try_accept('>'):
+        if operator == '>' and self.try_accept_value('>'):
             operator = '>>'
 
-            if self.try_accept('>'):
+            if self.try_accept_value('>'):
                 operator = '>>>'
 
         return operator
@@ -1941,55 +2174,34 @@ class Parser(object):
 # ------------------------------------------------------------------------------
 # -- Primary expressions --
 
+    # Primaries that start with a keyword or separator, by its value
+    primary_parsers = {
+        '(': 'parse_par_expression',
+        'this': 'parse_this_primary',
+        'super': 'parse_super_primary',
+        'new': 'parse_new_primary',
+        '<': 'parse_generic_primary',
+        'void': 'parse_void_class_reference',
+    }
+
     @parse_debug
     def parse_primary(self):
         token = self.tokens.look()
+        method = self.primary_parsers.get(token.value)
 
-        if isinstance(token, Literal):
+        if method:
+            return getattr(self, method)()
+
+        elif isinstance(token, Literal):
             literal = self.parse_literal()
             literal._position = token.position
             return literal
 
-        elif token.value == '(':
-            return self.parse_par_expression()
-
-        elif self.try_accept('this'):
-            arguments = None
-
-            if self.would_accept('('):
-                arguments = self.parse_arguments()
-                return tree.ExplicitConstructorInvocation(arguments=arguments)
-
-            return tree.This()
-        elif self.would_accept('super', '::'):
-            self.accept('super')
-            return token
-        elif self.try_accept('super'):
-            super_suffix = self.parse_super_suffix()
-            return super_suffix
-
-        elif self.try_accept('new'):
-            return self.parse_creator()
-
-        elif token.value == '<':
-            type_arguments = self.parse_nonwildcard_type_arguments()
-
-            if self.try_accept('this'):
-                arguments = self.parse_arguments()
-                return tree.ExplicitConstructorInvocation(type_arguments=type_arguments,
-                                                          arguments=arguments)
-            else:
-                invocation = self.parse_explicit_generic_invocation_suffix()
-                invocation._position = token.position
-                invocation.type_arguments = type_arguments
-
-                return invocation
-
         elif isinstance(token, Identifier):
             qualified_identifier = [self.parse_identifier()]
 
-            while self.would_accept('.', Identifier):
-                self.accept('.')
+            while self.would_match(DOT_IDENTIFIER):
+                self.accept_value('.')
                 identifier = self.parse_identifier()
                 qualified_identifier.append(identifier)
 
@@ -2014,22 +2226,62 @@ class Parser(object):
 
             return tree.ClassReference(type=base_type)
 
-        elif self.try_accept('void'):
-            self.accept('.', 'class')
-            return tree.VoidClassReference()
-
         self.illegal("Expected expression")
 
+    @parse_debug
+    def parse_this_primary(self):
+        self.accept_value('this')
+
+        if self.would_accept_value('('):
+            arguments = self.parse_arguments()
+            return tree.ExplicitConstructorInvocation(arguments=arguments)
+
+        return tree.This()
+
+    @parse_debug
+    def parse_super_primary(self):
+        if self.would_accept('super', '::'):
+            return SuperQualifier.copy(next(self.tokens))
+
+        self.accept_value('super')
+        return self.parse_super_suffix()
+
+    @parse_debug
+    def parse_new_primary(self):
+        self.accept_value('new')
+        return self.parse_creator()
+
+    @parse_debug
+    def parse_generic_primary(self):
+        token = self.tokens.look()
+        type_arguments = self.parse_nonwildcard_type_arguments()
+
+        if self.try_accept_value('this'):
+            arguments = self.parse_arguments()
+            return tree.ExplicitConstructorInvocation(type_arguments=type_arguments,
+                                                      arguments=arguments)
+        else:
+            invocation = self.parse_explicit_generic_invocation_suffix()
+            invocation._position = token.position
+            invocation.type_arguments = type_arguments
+
+            return invocation
+
+    @parse_debug
+    def parse_void_class_reference(self):
+        self.accept('void', '.', 'class')
+        return tree.VoidClassReference()
+
     @parse_debug
     def parse_literal(self):
-        literal = self.accept(Literal)
+        literal = self.accept_kind(Literal)
         return tree.Literal(value=literal)
 
     @parse_debug
     def parse_par_expression(self):
-        self.accept('(')
+        self.accept_value('(')
         expression = self.parse_expression()
-        self.accept(')')
+        self.accept_value(')')
 
         return expression
 
@@ -2037,19 +2289,19 @@ class Parser(object):
     def parse_arguments(self):
         expressions = list()
 
-        self.accept('(')
+        self.accept_value('(')
 
-        if self.try_accept(')'):
+        if self.try_accept_value(')'):
             return expressions
 
         while True:
             expression = self.parse_expression()
             expressions.append(expression)
 
-            if not self.try_accept(','):
+            if not self.try_accept_value(','):
                 break
 
-        self.accept(')')
+        self.accept_value(')')
 
         return expressions
 
@@ -2059,13 +2311,13 @@ class Parser(object):
         type_arguments = None
         arguments = None
 
-        if self.try_accept('.'):
-            if self.would_accept('<'):
+        if self.try_accept_value('.'):
+            if self.would_accept_value('<'):
                 type_arguments = self.parse_nonwildcard_type_arguments()
 
             identifier = self.parse_identifier()
 
-            if self.would_accept('('):
+            if self.would_accept_value('('):
                 arguments = self.parse_arguments()
         else:
             arguments = self.parse_arguments()
@@ -2083,7 +2335,7 @@ class Parser(object):
     def parse_explicit_generic_invocation_suffix(self):
         identifier = None
         arguments = None
-        if self.try_accept('super'):
+        if self.try_accept_value('super'):
             return self.parse_super_suffix()
         else:
             identifier = self.parse_identifier()
@@ -2098,18 +2350,18 @@ class Parser(object):
     def parse_creator(self):
         constructor_type_arguments = None
 
-        if self.would_accept(BasicType):
+        if isinstance(self.tokens.look(), BasicType):
             created_name = self.parse_basic_type()
             rest = self.parse_array_creator_rest()
             rest.type = created_name
             return rest
 
-        if self.would_accept('<'):
+        if self.would_accept_value('<'):
             constructor_type_arguments = self.parse_nonwildcard_type_arguments()
 
         created_name = self.parse_created_name()
 
-        if self.would_accept('['):
+        if self.would_accept_value('['):
             if constructor_type_arguments:
                 self.illegal("Array creator not allowed with generic constructor type arguments")
 
@@ -2131,10 +2383,10 @@ class Parser(object):
         while True:
             tail.name = self.parse_identifier()
 
-            if self.would_accept('<'):
+            if self.would_accept_value('<'):
                 tail.arguments = self.parse_type_arguments_or_diamond()
 
-            if self.try_accept('.'):
+            if self.try_accept_value('.'):
                 tail.sub_type = tree.ReferenceType()
                 tail = tail.sub_type
             else:
@@ -2147,14 +2399,14 @@ class Parser(object):
         arguments = self.parse_arguments()
         class_body = None
 
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             class_body = self.parse_class_body()
 
         return (arguments, class_body)
 
     @parse_debug
     def parse_array_creator_rest(self):
-        if self.would_accept('[', ']'):
+        if self.would_match(DIMENSION):
             array_dimension = self.parse_array_dimension()
             array_initializer = self.parse_array_initializer()
 
@@ -2164,40 +2416,40 @@ class Parser(object):
         else:
             array_dimensions = list()
 
-            while self.would_accept('[') and not self.would_accept('[', ']'):
-                self.accept('[')
+            while self.would_accept_value('[') and not self.would_match(DIMENSION):
+                self.accept_value('[')
                 expression = self.parse_expression()
                 array_dimensions.append(expression)
-                self.accept(']')
+                self.accept_value(']')
 
             array_dimensions += self.parse_array_dimension()
             return tree.ArrayCreator(dimensions=array_dimensions)
 
     @parse_debug
     def parse_identifier_suffix(self):
-        if self.try_accept('[', ']'):
+        if self.try_match(DIMENSION):
             array_dimension = [None] + self.parse_array_dimension()
             self.accept('.', 'class')
             return tree.ClassReference(type=tree.Type(dimensions=array_dimension))
 
-        elif self.would_accept('('):
+        elif self.would_accept_value('('):
             arguments = self.parse_arguments()
             return tree.MethodInvocation(arguments=arguments)
 
-        elif self.try_accept('.', 'class'):
+        elif self.try_match(DOT_CLASS):
             return tree.ClassReference()
 
-        elif self.try_accept('.', 'this'):
+        elif self.try_match(DOT_THIS):
             return tree.This()
 
-        elif self.would_accept('.', '<'):
+        elif self.would_match(DOT_TYPE_ARGUMENTS):
             next(self.tokens)
             return self.parse_explicit_generic_invocation()
 
-        elif self.try_accept('.', 'new'):
+        elif self.try_match(DOT_NEW):
             type_arguments = None
 
-            if self.would_accept('<'):
+            if self.would_accept_value('<'):
                 type_arguments = self.parse_nonwildcard_type_arguments()
 
             inner_creator = self.parse_inner_creator()
@@ -2205,7 +2457,7 @@ class Parser(object):
 
             return inner_creator
 
-        elif self.would_accept('.', 'super', '('):
+        elif self.would_match(DOT_SUPER_CALL):
             self.accept('.', 'super')
             arguments = self.parse_arguments()
             return tree.SuperConstructorInvocation(arguments=arguments)
@@ -2230,7 +2482,7 @@ class Parser(object):
         identifier = self.parse_identifier()
         type_arguments = None
 
-        if self.would_accept('<'):
+        if self.would_accept_value('<'):
             type_arguments = self.parse_nonwildcard_type_arguments_or_diamond()
 
         java_type = tree.ReferenceType(name=identifier,
@@ -2244,19 +2496,19 @@ class Parser(object):
 
     @parse_debug
     def parse_selector(self):
-        if self.try_accept('['):
+        if self.try_accept_value('['):
             expression = self.parse_expression()
-            self.accept(']')
+            self.accept_value(']')
             return tree.ArraySelector(index=expression)
 
-        elif self.try_accept('.'):
+        elif self.try_accept_value('.'):
 
             token = self.tokens.look()
             if isinstance(token, Identifier):
                 identifier = self.tokens.next().value
                 arguments = None
 
-                if self.would_accept('('):
+                if self.would_accept_value('('):
                     arguments = self.parse_arguments()
 
                     return tree.MethodInvocation(member=identifier,
@@ -2264,18 +2516,18 @@ class Parser(object):
                 else:
                     return tree.MemberReference(member=identifier)
             elif self.would_accept('super', '::'):
-                self.accept('super')
-                return token
-            elif self.would_accept('<'):
+                self.accept_value('super')
+                return SuperQualifier.copy(token)
+            elif self.would_accept_value('<'):
                 return self.parse_explicit_generic_invocation()
-            elif self.try_accept('this'):
+            elif self.try_accept_value('this'):
                 return tree.This()
-            elif self.try_accept('super'):
+            elif self.try_accept_value('super'):
                 return self.parse_super_suffix()
-            elif self.try_accept('new'):
+            elif self.try_accept_value('new'):
                 type_arguments = None
 
-                if self.would_accept('<'):
+                if self.would_accept_value('<'):
                     type_arguments = self.parse_nonwildcard_type_arguments()
 
                 inner_creator = self.parse_inner_creator()
@@ -2293,24 +2545,24 @@ class Parser(object):
         constants = list()
         body_declarations = list()
 
-        self.accept('{')
+        self.accept_value('{')
 
-        if not self.try_accept(','):
-            while not (self.would_accept(';') or self.would_accept('}')):
+        if not self.try_accept_value(','):
+            while not (self.would_accept_value(';') or self.would_accept_value('}')):
                 constant = self.parse_enum_constant()
                 constants.append(constant)
 
-                if not self.try_accept(','):
+                if not self.try_accept_value(','):
                     break
 
-        if self.try_accept(';'):
-            while not self.would_accept('}'):
+        if self.try_accept_value(';'):
+            while not self.would_accept_value('}'):
                 declaration = self.parse_class_body_declaration()
 
                 if declaration:
                     body_declarations.append(declaration)
 
-        self.accept('}')
+        self.accept_value('}')
 
         return tree.EnumBody(constants=constants,
                              declarations=body_declarations)
@@ -2327,15 +2579,15 @@ class Parser(object):
         if next_token:
             javadoc = next_token.javadoc
 
-        if self.would_accept(Annotation):
+        if isinstance(self.tokens.look(), Annotation):
             annotations = self.parse_annotations()
 
         constant_name = self.parse_identifier()
 
-        if self.would_accept('('):
+        if self.would_accept_value('('):
             arguments = self.parse_arguments()
 
-        if self.would_accept('{'):
+        if self.would_accept_value('{'):
             body = self.parse_class_body()
 
         return tree.EnumConstantDeclaration(annotations=annotations,
@@ -2348,9 +2600,9 @@ class Parser(object):
     def parse_annotation_type_body(self):
         declarations = None
 
-        self.accept('{')
+        self.accept_value('{')
         declarations = self.parse_annotation_type_element_declarations()
-        self.accept('}')
+        self.accept_value('}')
 
         return declarations
 
@@ -2358,7 +2610,7 @@ class Parser(object):
     def parse_annotation_type_element_declarations(self):
         declarations = list()
 
-        while not self.would_accept('}'):
+        while not self.would_accept_value('}'):
             declaration = self.parse_annotation_type_element_declaration()
             declarations.append(declaration)
 
@@ -2370,11 +2622,11 @@ class Parser(object):
         declaration = None
 
         token = self.tokens.look()
-        if self.would_accept('class'):
+        if self.would_accept_value('class'):
             declaration = self.parse_normal_class_declaration()
-        elif self.would_accept('interface'):
+        elif self.would_accept_value('interface'):
             declaration = self.parse_normal_interface_declaration()
-        elif self.would_accept('enum'):
+        elif self.would_accept_value('enum'):
             declaration = self.parse_enum_declaration()
         elif self.is_annotation_declaration():
             declaration = self.parse_annotation_type_declaration()
@@ -2382,7 +2634,7 @@ class Parser(object):
             attribute_type = self.parse_type()
             attribute_name = self.parse_identifier()
             declaration = self.parse_annotation_method_or_constant_rest()
-            self.accept(';')
+            self.accept_value(';')
 
             if isinstance(declaration, tree.AnnotationMethod):
                 declaration.name = attribute_name
@@ -2400,13 +2652,13 @@ class Parser(object):
 
     @parse_debug
     def parse_annotation_method_or_constant_rest(self):
-        if self.try_accept('('):
-            self.accept(')')
+        if self.try_accept_value('('):
+            self.accept_value(')')
 
             array_dimension = self.parse_array_dimension()
             default = None
 
-            if self.try_accept('default'):
+            if self.try_accept_value('default'):
                 default = self.parse_element_value()
 
             return tree.AnnotationMethod(dimensions=array_dimension,
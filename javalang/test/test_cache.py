@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from .. import cache, parse, parser, tokenizer
+from .test_tokenizer import TokenTestCase
+
+
+CODE = u"""/** A class */
+class Caf\\u00e9 {
+    String s = "caf\u00e9";
+}"""
+
+
+class CountingCache(cache.LRUCache):
+    def __init__(self, maxsize=128):
+        super(CountingCache, self).__init__(maxsize)
+        self.misses = 0
+
+    def get(self, key):
+        tokens = super(CountingCache, self).get(key)
+        if tokens is None:
+            self.misses += 1
+        return tokens
+
+
+class TestCache(TokenTestCase):
+
+    def test_cache_key(self):
+        self.assertEqual(cache.cache_key(CODE), cache.cache_key(CODE))
+        self.assertNotEqual(cache.cache_key(CODE), cache.cache_key(CODE + u' '))
+        self.assertNotEqual(cache.cache_key(CODE), cache.cache_key(CODE, ignore_errors=True))
+
+    def test_lru_cache(self):
+        lru = CountingCache(maxsize=2)
+
+        tokens = cache.tokenize(CODE, lru)
+        self.assertSameTokens(tokens, list(tokenizer.tokenize(CODE)))
+        self.assertSameTokens(cache.tokenize(CODE, lru), tokens)
+        self.assertEqual(lru.misses, 1)
+
+        cache.tokenize(u'int a;', lru)
+        cache.tokenize(u'int b;', lru)
+        self.assertEqual(len(lru), 2)
+
+        cache.tokenize(CODE, lru)
+        self.assertEqual(lru.misses, 4)
+
+    def test_parse_cached_tokens(self):
+        code = u"class A { Object m() { return super::toString; } Object n = B.super::m; }"
+        lru = cache.LRUCache()
+
+        tokens = cache.tokenize(code, lru)
+        first = parser.Parser(tokens).parse()
+        expected = repr(first)
+        second = parser.Parser(cache.tokenize(code, lru)).parse()
+
+        self.assertEqual(repr(second), expected)
+        self.assertEqual(repr(first), expected)
+        self.assertEqual(expected, repr(parse.parse(code)))
+
+        # Parsing does not write to the tokens it is given
+        for token in tokens:
+            self.assertFalse(hasattr(token, 'selectors'))
+
+    def test_errors_not_cached(self):
+        lru = cache.LRUCache()
+
+        with self.assertRaises(tokenizer.LexerError):
+            cache.tokenize(u'int # a;', lru)
+        self.assertEqual(len(lru), 0)
+
+        self.assertEqual(len(cache.tokenize(u'int # a;', lru, ignore_errors=True)), 3)
+        with self.assertRaises(tokenizer.LexerError):
+            cache.tokenize(u'int # a;', lru)
+
+    def test_encode_tokens(self):
+        expected = list(tokenizer.tokenize(CODE))
+        data = cache.encode_tokens(expected)
+
+        self.assertSameTokens(cache.decode_tokens(data), expected)
+        self.assertEqual(cache.decode_tokens(cache.encode_tokens([])), [])
+
+        with self.assertRaises(ValueError):
+            cache.decode_tokens(data[:-1])
+        with self.assertRaises(ValueError):
+            cache.decode_tokens(b'not tokens' + data)
+
+        # Kinds past 255, e.g. of token classes defined by users
+        classes = [type('Token%d' % i, (tokenizer.Identifier,), {}) for i in range(256)]
+        tokens = [classes[-1](u"x", tokenizer.Position(1, 1), None, 0)]
+
+        self.assertTrue(classes[-1].kind > 255)
+        self.assertSameTokens(cache.decode_tokens(cache.encode_tokens(tokens)), tokens)
+
+    def test_disk_cache(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        disk = cache.DiskCache(os.path.join(directory, 'tokens'))
+        key = cache.cache_key(CODE)
+
+        self.assertIsNone(disk.get(key))
+        tokens = cache.tokenize(CODE, disk)
+        self.assertSameTokens(disk.get(key), tokens)
+
+        # Another instance, e.g. in another process, sees the same entries
+        other = cache.DiskCache(disk.directory)
+        self.assertSameTokens(cache.tokenize(CODE, other), tokens)
+
+        with open(disk.path(key), 'wb') as f:
+            f.write(b'JLTC')
+        self.assertIsNone(disk.get(key))
+
+        disk.clear()
+        self.assertEqual(os.listdir(disk.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
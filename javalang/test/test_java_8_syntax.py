@@ -138,6 +138,32 @@ class LambdaSupportTest(unittest.TestCase):
         """ this tests that a cast expression works as expected. """
         parse.parse(setup_java_class("String x = (String) A.x() ;"))
 
+    def test_speculation_predicates(self):
+        """ this tests the look ahead that rules out speculative parses of
+            lambdas, casts and local variable declarations.
+        """
+        def predicate(name, code):
+            return getattr(parser.Parser(parse.tokenize(code)), name)()
+
+        for code in ("() -> x", "(a, b) -> x", "(int[] a, String... b) -> x",
+                     "(final Map<K, ? extends V> m) -> x", "(@A(1) int a) -> x"):
+            self.assertTrue(predicate('may_be_lambda', code), code)
+        for code in ("(a) -> x", "(a + b) -> x", "(int a)", "(a, b)"):
+            self.assertFalse(predicate('may_be_lambda', code), code)
+
+        for code in ("(String) s", "(int[]) o", "(List<?>) (o)", "(a) -b",
+                     "(Foo) new Foo()", "(a.B<C>) this"):
+            self.assertTrue(predicate('may_be_cast', code), code)
+        for code in ("(a + b)", "(a) -> b", "(a).b", "(a) ? b : c", "(1) x",
+                     "()"):
+            self.assertFalse(predicate('may_be_cast', code), code)
+
+        for code in ("Foo x", "a.B[][] x", "List<String> x", "int x",
+                     "final Foo x"):
+            self.assertTrue(predicate('may_be_local_variable_declaration', code), code)
+        for code in ("x = 1", "a.b(c)", "a[i] = b", "x++", "a.<T>b()", ";"):
+            self.assertFalse(predicate('may_be_local_variable_declaration', code), code)
+
 
 class MethodReferenceSyntaxTest(unittest.TestCase):
 
@@ -176,6 +202,14 @@ class MethodReferenceSyntaxTest(unittest.TestCase):
         self.assert_contains_method_reference_expression_in_m(
             parse.parse(setup_java_class("super::toString;")))
 
+        _, reference = self.assert_contains_method_reference_expression_in_m(
+            parse.parse(setup_java_class("super::toString;")))[0]
+        self.assertEqual(reference.expression.value, 'super')
+        self.assertEqual(reference.expression.prefix_operators, [])
+        self.assertEqual(reference.expression.selectors, [])
+        self.assertEqual(reference.expression.postfix_operators, [])
+        self.assertEqual(reference.expression.position, (5, 9))
+
     def test_method_reference_from_super_with_identifier(self):
         """ test support for method references from Identifier.super. """
         self.assert_contains_method_reference_expression_in_m(
@@ -1,6 +1,6 @@
 import unittest
 
-from .. import javadoc
+from .. import javadoc, parse
 
 
 class TestJavadoc(unittest.TestCase):
@@ -10,5 +10,12 @@ class TestJavadoc(unittest.TestCase):
         javadoc.parse('/**\n *\n */')
         javadoc.parse('/**\n *\n *\n */')
 
+    def test_lazy_javadoc(self):
+        tree = parse.parse("/** Doc.\n * @author a */ class A { }", lazy_javadoc=True)
+        documentation = tree.types[0].documentation
+
+        self.assertEqual(documentation, "/** Doc.\n * @author a */")
+        self.assertEqual(javadoc.parse(documentation).description, "Doc.")
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from pkg_resources import resource_string
+from pkg_resources import resource_filename, resource_string
 from .. import parse
 
 
@@ -47,6 +47,13 @@ class PackageInfo(unittest.TestCase):
         self.failUnless(ast.package.annotations)
         self.failUnless(ast.package.documentation)
 
+    def testParseFile(self):
+        source_file = "source/package-info/JavadocAnnotation.java"
+        ast = parse.parse_file(resource_filename(__name__, source_file))
+
+        self.assertEqual(repr(ast), repr(self.get_ast(source_file)))
+        self.failUnless(ast.package.documentation)
+
     def get_ast(self, filename):
         source = resource_string(__name__, filename)
         ast = parse.parse(source)
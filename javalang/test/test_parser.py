@@ -0,0 +1,96 @@
+import unittest
+
+from .. import parse, parser, tokenizer, tree
+from ..tokenizer import Identifier
+
+
+class TestTokenMatching(unittest.TestCase):
+
+    def get_parser(self, code):
+        return parser.Parser(tokenizer.tokenize(code))
+
+    def test_accept(self):
+        p = self.get_parser("foo ( bar")
+
+        self.assertEqual(p.accept_kind(Identifier), "foo")
+        self.assertEqual(p.accept_value("("), "(")
+
+        with self.assertRaises(parser.JavaSyntaxError) as context:
+            p.accept_value(")")
+        self.assertEqual(context.exception.description, "Expected ')'")
+
+        p = self.get_parser("( foo")
+        with self.assertRaises(parser.JavaSyntaxError) as context:
+            p.accept_kind(Identifier)
+        self.assertEqual(context.exception.description, "Expected Identifier")
+        self.assertEqual(context.exception.at.value, "foo")
+
+    def test_try_accept(self):
+        p = self.get_parser("a . b [ ]")
+
+        self.assertFalse(p.try_accept_value("."))
+        self.assertTrue(p.would_accept_value("a"))
+        self.assertFalse(p.would_match(parser.DOT_IDENTIFIER))
+        self.assertTrue(p.try_accept_value("a"))
+
+        self.assertTrue(p.would_match(parser.DOT_IDENTIFIER))
+        self.assertFalse(p.try_match(parser.DIMENSION))
+        self.assertTrue(p.try_match(parser.DOT_IDENTIFIER))
+        self.assertTrue(p.try_match(parser.DIMENSION))
+
+        self.assertFalse(p.would_match(parser.DIMENSION))
+        self.assertFalse(p.try_accept_value("]"))
+
+    def test_matcher(self):
+        matcher = parser.Matcher(".", Identifier, "(")
+
+        self.assertEqual(len(matcher), 3)
+        self.assertEqual(matcher.accepts, (".", Identifier, "("))
+        self.assertTrue(self.get_parser(". a (").would_match(matcher))
+        self.assertFalse(self.get_parser(". a").would_match(matcher))
+
+        with self.assertRaises(parser.JavaParserError):
+            parser.Matcher()
+
+
+class TestBinaryOperation(unittest.TestCase):
+
+    def render(self, node):
+        if isinstance(node, tree.BinaryOperation):
+            return "(%s %s %s)" % (self.render(node.operandl), node.operator,
+                                   self.render(node.operandr))
+        elif isinstance(node, tree.Type):
+            return node.name
+        return node.member
+
+    def test_precedence(self):
+        expressions = [
+            ("a", "a"),
+            ("a - b - c + d", "(((a - b) - c) + d)"),
+            ("a + b * c - d / e % f", "((a + (b * c)) - ((d / e) % f))"),
+            ("a || b && c | d ^ e & f == g < h << i + j * k",
+             "(a || (b && (c | (d ^ (e & (f == (g < (h << (i + (j * k))))))))))"),
+            ("a * b + c << d > e != f & g ^ h | i && j || k",
+             "((((((((((a * b) + c) << d) > e) != f) & g) ^ h) | i) && j) || k)"),
+            ("a < b == c instanceof T && d >>> e", "(((a < b) == (c instanceof T)) && (d >>> e))"),
+        ]
+
+        for code, expected in expressions:
+            self.assertEqual(self.render(parse.parse_expression(code)), expected)
+
+    def test_long_chain(self):
+        names = ["s%d" % i for i in range(500)]
+        expression = parse.parse_expression(" + ".join(names))
+
+        operands = []
+        while isinstance(expression, tree.BinaryOperation):
+            self.assertEqual(expression.operator, "+")
+            operands.append(expression.operandr.member)
+            expression = expression.operandl
+        operands.append(expression.member)
+
+        self.assertEqual(operands[::-1], names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,29 @@
+import codecs
+import gc
+import itertools
+import os
+import tempfile
 import unittest
+import weakref
+
+import six
+
 from .. import tokenizer
 
 
-class TestTokenizer(unittest.TestCase):
+class TokenTestCase(unittest.TestCase):
+
+    def assertSameTokens(self, tokens, expected):
+        self.assertEqual(len(tokens), len(expected))
+        for token, other in zip(tokens, expected):
+            self.assertEqual(type(token), type(other))
+            self.assertEqual(token.value, other.value)
+            self.assertEqual(token.position, other.position)
+            self.assertEqual(token.offset, other.offset)
+            self.assertEqual(token.javadoc, other.javadoc)
+
+
+class TestTokenizer(TokenTestCase):
 
     def test_tokenizer_annotation(self):
         # Given
@@ -119,6 +140,57 @@ public int function() {
         # Then
         self.assertEqual(len(tokens), 14)
 
+    def test_tokenize_empty_fraction_at_end(self):
+        # Given
+        code = "double d = 2."
+
+        # When
+        tokens = list(tokenizer.tokenize(code))
+
+        # Then
+        self.assertEqual(len(tokens), 4)
+        self.assertEqual(type(tokens[3]), tokenizer.DecimalFloatingPoint)
+        self.assertEqual(tokens[3].value, "2.")
+
+    def test_tokenize_zero_at_end(self):
+        for regex in (False, True):
+            tokens = list(tokenizer.tokenize("int x = 0", regex=regex))
+
+            self.assertEqual(len(tokens), 4)
+            self.assertEqual(type(tokens[3]), tokenizer.DecimalInteger)
+            self.assertEqual(tokens[3].value, "0")
+
+    def test_tokenize_invalid_hex_float_at_end(self):
+        for regex in (False, True):
+            with self.assertRaises(tokenizer.LexerError) as context:
+                list(tokenizer.tokenize("x = 0x1.", regex=regex))
+            self.assertEqual(str(context.exception),
+                             'Invalid hex float literal at "", line 1: x = 0x1.')
+
+        java_tokenizer = tokenizer.JavaTokenizer("x = 0x1.", ignore_errors=True)
+        tokens = list(java_tokenizer.tokenize())
+
+        self.assertEqual(tokens[2].value, "0x1.")
+        self.assertEqual(java_tokenizer.diagnostics,
+                         [tokenizer.Diagnostic(4, 'invalid_hex_float', '')])
+
+    def test_tokenize_string_escapes(self):
+        # Given
+        # An illegal escape is reported, after which the next character is read
+        # as an escape in its place
+        code = r'''"a\tb\0\17\377\"" '\'' "c\q\" 'e'''
+
+        # When
+        java_tokenizer = tokenizer.JavaTokenizer(code, ignore_errors=True)
+        tokens = list(java_tokenizer.tokenize())
+
+        # Then
+        self.assertEqual([t.value for t in tokens],
+                         [r'"a\tb\0\17\377\""', r"'\''", r'"c\q\"', "'e"])
+        self.assertEqual([d.code for d in java_tokenizer.diagnostics],
+                         ['illegal_escape', 'unterminated_literal'])
+        self.assertEqual(java_tokenizer.diagnostics[0].char, 'q')
+
     def test_string_delim_within_comment(self):
 
         # Given
@@ -188,5 +260,507 @@ int k;
         self.assertEqual(token[0].position.column, 1)
         self.assertEqual(token[3].position.column, 1)
 
+    def test_regex_engine_matches_loop(self):
+        code = """/** doc */
+@Deprecated public class A<T> extends B {
+    long l = 0xFFL + 0b1_0 + 017 + 1_000L; double d = .5e-3 + 1.f + 0x1.8p3d;
+    char c = '\\n'; String s = "a \\"b\\" \\u0041 \\17";
+    int caf\u00e9 = 1; // comment
+    void m(int... xs) { x >>>= 1; y = a -> a::b; /* block
+    comment */ return; }
+}"""
+
+        expected = list(tokenizer.tokenize(code))
+        tokens = list(tokenizer.tokenize(code, regex=True))
+
+        self.assertSameTokens(tokens, expected)
+
+    def test_regex_engine_errors(self):
+        code = "int a = 1; # /* unterminated"
+
+        with self.assertRaises(tokenizer.LexerError):
+            list(tokenizer.tokenize(code, regex=True))
+
+        tokens = list(tokenizer.tokenize(code, ignore_errors=True, regex=True))
+        self.assertEqual(len(tokens), 5)
+
+    def test_diagnostics(self):
+        code = "int a = 1; # b;\nint c = 'x"
+        java_tokenizer = tokenizer.JavaTokenizer(code, ignore_errors=True)
+
+        tokens = list(java_tokenizer.tokenize())
+
+        self.assertEqual(len(tokens), 11)
+        self.assertEqual(java_tokenizer.diagnostics[0],
+                         tokenizer.Diagnostic(11, 'invalid_token', '#'))
+        self.assertEqual(java_tokenizer.diagnostics[1][:2], (24, 'unterminated_literal'))
+        self.assertEqual(str(java_tokenizer.errors[0]),
+                         'Could not process token at "#", line 1: int a = 1; # b;')
+        self.assertTrue(java_tokenizer.errors is java_tokenizer.errors)
+        self.assertEqual(len(java_tokenizer.errors), 2)
+
+        # The list of errors can be replaced, and is appended to
+        java_tokenizer = tokenizer.JavaTokenizer(code, ignore_errors=True)
+        java_tokenizer.errors = []
+        tokens = java_tokenizer.tokenize()
+
+        self.assertEqual(len(list(itertools.islice(tokens, 6))), 6)
+        java_tokenizer.errors.append(tokenizer.LexerError("first"))
+        list(tokens)
+
+        self.assertEqual([str(e)[:8] for e in java_tokenizer.errors],
+                         ['Could no', 'first', 'Untermin'])
+
+    def test_max_errors(self):
+        code = "int a; # # # # int b;"
+
+        java_tokenizer = tokenizer.JavaTokenizer(code, ignore_errors=True, max_errors=2)
+        tokens = list(java_tokenizer.tokenize())
+
+        self.assertEqual([t.value for t in tokens], ["int", "a", ";"])
+        self.assertEqual([d.code for d in java_tokenizer.diagnostics],
+                         ['invalid_token', 'invalid_token', 'too_many_errors'])
+
+        tokens = list(tokenizer.tokenize(code, ignore_errors=True, regex=True, max_errors=4))
+        self.assertEqual([t.value for t in tokens], ["int", "a", ";", "int", "b", ";"])
+
+    def test_identifier_types(self):
+        code = "public int x = this.y ? null : true; String s = false;"
+        tokens = list(tokenizer.tokenize(code))
+
+        self.assertEqual([type(t) for t in tokens
+                          if t.value in ("public", "int", "this", "null", "true", "String")],
+                         [tokenizer.Modifier, tokenizer.BasicType, tokenizer.Keyword,
+                          tokenizer.Null, tokenizer.Boolean, tokenizer.Identifier])
+
+    def test_names_shared(self):
+        code = "String a = b; String b = a; int c = 1; int d = 1;"
+
+        for regex in (False, True):
+            tokens = list(tokenizer.tokenize(code, regex=regex))
+
+            self.assertIs(tokens[0].value, tokens[5].value)
+            self.assertIs(tokens[1].value, tokens[8].value)
+            self.assertIs(tokens[10].value, tokens[15].value)
+
+    def test_non_ascii_identifiers(self):
+        code = u"int caf\u00e9 = \u00c0b\u0301c + $x_1 + \u03bb\u00b5;"
+
+        tokens = list(tokenizer.tokenize(code))
+
+        self.assertEqual([t.value for t in tokens],
+                         [u"int", u"caf\u00e9", u"=", u"\u00c0b\u0301c", u"+",
+                          u"$x_1", u"+", u"\u03bb\u00b5", u";"])
+        self.assertEqual(type(tokens[1]), tokenizer.Identifier)
+        self.assertEqual(type(tokens[3]), tokenizer.Identifier)
+
+    def test_unicode_escape_positions(self):
+        # Columns
+        #                  1111111111222222222
+        #         1234567890123456789012345678
+        code = u"char c = '\\u0041'; int \\u0078;\nint y;"
+
+        tokens = list(tokenizer.tokenize(code))
+
+        self.assertEqual(tokens[3].value, u"'A'")
+        self.assertEqual(tokens[3].position, (1, 10))
+        self.assertEqual(tokens[4].position, (1, 18))
+        self.assertEqual(tokens[6].value, u"x")
+        self.assertEqual(tokens[6].position, (1, 24))
+        self.assertEqual(tokens[7].position, (1, 30))
+        self.assertEqual(tokens[9].position, (2, 5))
+
+    def test_no_unicode_escapes_keeps_data(self):
+        code = u"int x = 1; // \\ not an escape"
+        java_tokenizer = tokenizer.JavaTokenizer(code)
+
+        list(java_tokenizer.tokenize())
+
+        self.assertTrue(java_tokenizer.data is code)
+
+    def test_token_kinds(self):
+        tokens = list(tokenizer.tokenize("public int x = 0x1F;"))
+
+        for token in tokens:
+            self.assertFalse(hasattr(token, '__dict__'))
+            self.assertTrue(tokenizer.TOKEN_KINDS[token.kind] is type(token))
+
+        self.assertEqual(tokens[0].kind, tokenizer.Modifier.kind)
+        self.assertEqual(tokens[4].kind, tokenizer.HexInteger.kind)
+        self.assertEqual(len(set(cls.kind for cls in tokenizer.TOKEN_KINDS)),
+                         len(tokenizer.TOKEN_KINDS))
+
+    def test_token_subclass(self):
+        class Tagged(tokenizer.Identifier):
+            pass
+
+        token = Tagged("x")
+        token.tag = "local"
+
+        self.assertEqual(token.tag, "local")
+        self.assertTrue(tokenizer.TOKEN_KINDS[Tagged.kind] is Tagged)
+
+    def test_token_offsets(self):
+        code = u"int a;\n  /* \n */ char \\u0063 = '\\u0041';\n\"x\ny\" z"
+        tokens = list(tokenizer.tokenize(code, ignore_errors=True))
+
+        self.assertEqual([t.offset for t in tokens], [0, 4, 5, 17, 22, 29, 31, 39, 41, 47])
+        self.assertEqual(code[tokens[4].offset:tokens[5].offset], u"\\u0063 ")
+
+        self.assertTrue(isinstance(tokens[3]._position, tokenizer.LineIndex))
+        self.assertEqual(tokens[3].position, (3, 5))
+        self.assertEqual(tokens[3]._position, (3, 5))
+        self.assertEqual(tokens[6].position, (3, 19))
+
+        # Literals spanning lines do not throw off the positions following them
+        self.assertEqual(tokens[9].position, (5, 4))
+
+    def test_positions_keep_no_tokenizer(self):
+        java_tokenizer = tokenizer.JavaTokenizer(u"int a;\n  char \\u0063;")
+        tokens = list(java_tokenizer.tokenize())
+
+        reference = weakref.ref(java_tokenizer)
+        del java_tokenizer
+        gc.collect()
+
+        self.assertTrue(reference() is None)
+        self.assertEqual(tokens[4].position, (2, 8))
+
+        token = tokenizer.Identifier("x", tokenizer.Position(2, 3))
+        self.assertEqual(token.position, (2, 3))
+        self.assertEqual(token.offset, None)
+
+    def test_lazy_javadoc(self):
+        code = "/** A */ class A { /* b */ /** C */ int c; }"
+
+        for regex in (False, True):
+            tokens = list(tokenizer.tokenize(code, regex=regex, lazy_javadoc=True))
+
+            span = tokens[0].javadoc
+            self.assertIsInstance(span, tokenizer.JavadocSpan)
+            self.assertEqual((span.start, span.end), (0, 8))
+            self.assertEqual(span, "/** A */")
+            self.assertEqual(span.text, "/** A */")
+            self.assertEqual(tokens[3].javadoc, "/** C */")
+            self.assertEqual([t.javadoc for t in tokens[1:3] + tokens[4:]], [None] * 5)
+
+    def test_trivia(self):
+        code = u"/* License */\n// TODO \\u0078\nclass A { /** Doc */ int x; }"
+        expected = [
+            (tokenizer.BLOCK_COMMENT, u"/* License */"),
+            (tokenizer.WHITESPACE, u"\n"),
+            (tokenizer.LINE_COMMENT, u"// TODO \\u0078\n"),
+            (tokenizer.WHITESPACE, u" "),
+            (tokenizer.WHITESPACE, u" "),
+            (tokenizer.WHITESPACE, u" "),
+            (tokenizer.JAVADOC, u"/** Doc */"),
+            (tokenizer.WHITESPACE, u" "),
+            (tokenizer.WHITESPACE, u" "),
+            (tokenizer.WHITESPACE, u" "),
+        ]
+
+        for regex in (False, True):
+            trivia = []
+            tokens = list(tokenizer.tokenize(code, regex=regex, trivia=trivia))
+
+            self.assertEqual(len(tokens), 7)
+            self.assertEqual(tokens[3].javadoc, u"/** Doc */")
+            self.assertEqual([(t.kind, code[t.start:t.end]) for t in trivia], expected)
+
+    def test_tokenize_to_arrays(self):
+        code = u"/** doc */\nclass A {\n  char c = '\\u0041';\n}"
+        tokens = list(tokenizer.tokenize(code))
+        arrays = tokenizer.tokenize_to_arrays(code)
+
+        self.assertEqual(len(arrays), len(tokens))
+
+        for index, token in enumerate(tokens):
+            self.assertTrue(arrays.token_type(index) is type(token))
+            self.assertEqual(arrays.kinds[index], token.kind)
+            self.assertEqual((arrays.lines[index], arrays.columns[index]),
+                             token.position)
+
+        self.assertEqual(arrays.text(1), u"A")
+        self.assertEqual(arrays.text(6), u"'\\u0041'")
+
+    def test_tokenize_to_arrays_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            raise unittest.SkipTest("numpy is not available")
+
+        arrays = tokenizer.tokenize_to_arrays(u"int x = 1;", as_numpy=True)
+
+        self.assertTrue(isinstance(arrays.kinds, numpy.ndarray))
+        self.assertEqual(list(arrays.starts), [0, 4, 6, 8, 9])
+        self.assertEqual(list(arrays.ends), [3, 5, 7, 9, 10])
+
+    def test_tokenize_stream(self):
+        code = (u"/** doc */ class A {\n  String s = \"a b // c\";\n"
+                u"  /* x\n y */ long l = 0x1F_FFL; char c = '\\u0041';\n"
+                u"  int caf\u00e9 = 1 >>>= 2; }")
+        expected = list(tokenizer.tokenize(code))
+
+        for size in (1, 2, 3, 7, 100):
+            chunks = [code[i:i + size] for i in range(0, len(code), size)]
+            tokens = list(tokenizer.tokenize_stream(chunks))
+
+            self.assertSameTokens(tokens, expected)
+
+    def test_tokenize_stream_bounded(self):
+        chunks = (u"int x%d = 1; // line\n" % i for i in range(1000))
+        java_tokenizer = tokenizer.JavaStreamTokenizer(chunks)
+
+        for token in java_tokenizer.tokenize():
+            self.assertTrue(len(java_tokenizer.data) < 50)
+
+        self.assertEqual(token.position, (1000, 13))
+
+    def test_tokenize_stream_open_literal(self):
+        for literal in (u"\"open", u"'\\q'", u"\"illegal \\q escape\""):
+            chunks = itertools.chain([u"String s = %s;\n" % literal],
+                                     (u"int x%d = 1; // line\n" % i for i in range(1000)))
+            java_tokenizer = tokenizer.JavaStreamTokenizer(chunks, ignore_errors=True)
+
+            for token in java_tokenizer.tokenize():
+                self.assertTrue(len(java_tokenizer.data) < 50)
+
+            self.assertEqual(token.position, (1001, 13))
+            self.assertEqual(java_tokenizer.diagnostics[0].offset, 11)
+
+    def test_tokenize_stream_errors(self):
+        with self.assertRaises(tokenizer.LexerError):
+            list(tokenizer.tokenize_stream([u"int a = \"", u"unterminated"]))
+
+    def assert_retokenize(self, code, offset, deleted, inserted):
+        tokens = list(tokenizer.tokenize(code))
+        new_code = code[:offset] + inserted + code[offset + deleted:]
+
+        expected = list(tokenizer.tokenize(new_code, ignore_errors=True))
+        retokenized = tokenizer.retokenize(code, tokens, offset, deleted,
+                                           inserted, ignore_errors=True)
+
+        self.assertSameTokens(retokenized, expected)
+
+    def test_retokenize(self):
+        code = ("class A {\n"
+                "    /** Doc */\n"
+                "    int x = 1; String s = \"a b\";\n"
+                "    void m() { return; } /* end */\n"
+                "}\n")
+
+        # Edit within a line, joining and splitting tokens
+        self.assert_retokenize(code, code.index('x'), 1, 'xyz')
+        self.assert_retokenize(code, code.index(' = 1'), 1, '')
+        self.assert_retokenize(code, code.index('1;'), 1, '0x1F + 2')
+
+        # Edits adding and removing lines
+        self.assert_retokenize(code, code.index('int'), 0, 'long l;\n\n    ')
+        self.assert_retokenize(code, code.index('\n    void'), 5, '')
+
+        # Opening and closing comments and literals
+        self.assert_retokenize(code, code.index('int'), 0, '/* ')
+        self.assert_retokenize(code, code.index(' */'), 3, '')
+        self.assert_retokenize(code, code.index(' b'), 0, '" + "')
+        self.assert_retokenize(code, code.index('"a b"'), 1, '')
+        self.assert_retokenize(code, code.index('a b'), 0, '*/ "')
+        self.assert_retokenize(code, code.index('Doc'), 0, '*/ int y; /**')
+
+    def test_scan_stats(self):
+        code = ("/** Doc */\n"
+                "int a = 1; // one\n"
+                "\n"
+                "  String s = \"a\n"
+                "b\";\n"
+                "/* c\n"
+                "\n"
+                "*/ a += b;\n")
+
+        stats = tokenizer.scan_stats(code)
+
+        self.assertEqual(stats.lines, 8)
+        self.assertEqual(stats.code_lines, 4)
+        self.assertEqual(stats.comment_lines, 5)
+        self.assertEqual(stats.blank_lines, 1)
+        self.assertEqual(stats.tokens, len(list(tokenizer.tokenize(code))))
+        self.assertEqual(stats.token_types, {'BasicType': 1, 'Identifier': 5, 'Operator': 3,
+                                             'DecimalInteger': 1, 'Separator': 3, 'String': 1})
+        self.assertEqual(stats.keywords, {'int': 1})
+        self.assertEqual(stats.operators, {'=': 2, '+=': 1})
+
+        self.assertEqual(tokenizer.scan_stats("").lines, 0)
+
+    def test_reformat_tokens(self):
+        code = "class A { int a, b = 1 + 2; void m() { if (a) { return; } } }"
+
+        self.assertEqual(tokenizer.reformat_tokens(tokenizer.tokenize(code)),
+                         "class A {\n"
+                         "    int a, b = 1 + 2;\n"
+                         "    void m() {\n"
+                         "        if(a) {\n"
+                         "            return;\n"
+                         "            \n"
+                         "        }\n"
+                         "    }\n"
+                         "}\n")
+
+        out = six.StringIO()
+        tokenizer.write_reformatted_tokens(tokenizer.tokenize(code), out, buffer_size=1)
+        self.assertEqual(out.getvalue(), tokenizer.reformat_tokens(tokenizer.tokenize(code)))
+
+        # Token classes defined after the tokenizer are formatted by their base
+        class Name(tokenizer.Identifier):
+            pass
+
+        tokens = [Name(t.value) if isinstance(t, tokenizer.Identifier) else t
+                  for t in tokenizer.tokenize(code)]
+        self.assertEqual(tokenizer.reformat_tokens(tokens),
+                         tokenizer.reformat_tokens(tokenizer.tokenize(code)))
+
+    def test_split_points(self):
+        code = ("int a;\n"
+                "/* b;\n"
+                "c; */ String d = \"e\\\n"
+                "f\";\n"
+                "// g\n"
+                "int h;\n")
+
+        self.assertEqual(tokenizer.split_points(code, 1),
+                         [code.index('/*'), code.index('// g'), code.index('int h')])
+        self.assertEqual(tokenizer.split_points(code, 10), [code.index('// g')])
+
+    def test_tokenize_parallel(self):
+        code = ("/** A */\n"
+                "class A {\n"
+                "    int a = 1; String s = \"a\n"
+                "b\"; /* c\n"
+                "d */ long l;\n"
+                "    /** E */\n"
+                "\n"
+                "    void e() { }\n"
+                "}\n") * 3
+
+        expected = list(tokenizer.tokenize(code))
+        tokens = tokenizer.tokenize_parallel(code, processes=2, chunk_size=1)
+
+        self.assertSameTokens(tokens, expected)
+
+        with self.assertRaises(tokenizer.LexerError):
+            tokenizer.tokenize_parallel(code + "#\n" + code, processes=2, chunk_size=1)
+
+    def write_temp_file(self, data):
+        fd, path = tempfile.mkstemp(suffix='.java')
+        self.addCleanup(os.remove, path)
+
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        return path
+
+    def test_tokenize_file(self):
+        code = u"class Caf\u00e9 { }"
+        expected = [u"class", u"Caf\u00e9", u"{", u"}"]
+
+        for data in (code.encode('utf_8'),
+                     codecs.BOM_UTF8 + code.encode('utf_8'),
+                     codecs.BOM_UTF16_LE + code.encode('utf_16_le'),
+                     codecs.BOM_UTF32_BE + code.encode('utf_32_be'),
+                     code.encode('iso-8859-1')):
+            path = self.write_temp_file(data)
+            tokens = list(tokenizer.tokenize_file(path))
+
+            self.assertEqual([t.value for t in tokens], expected)
+            self.assertEqual(tokens[0].position, (1, 1))
+
+    def test_tokenize_file_encoding(self):
+        path = self.write_temp_file(u"char c = '\u00e9';".encode('cp1252'))
+
+        tokens = list(tokenizer.tokenize_file(path, encoding='cp1252'))
+        self.assertEqual(tokens[3].value, u"'\u00e9'")
+
+        self.assertEqual(list(tokenizer.tokenize_file(self.write_temp_file(b''))), [])
+
+    def test_read_file_memory(self):
+        try:
+            import tracemalloc
+        except ImportError:
+            raise unittest.SkipTest("tracemalloc is not available")
+
+        code = b"int a = 1; // line\n" * 50000
+
+        # Giving up on UTF-8 takes more for a moment, as the UnicodeDecodeError
+        # holds a copy of the input
+        for data, limit in ((code, 1.2), (codecs.BOM_UTF8 + code, 1.2),
+                            (code + b"// \xe9\n", 2.2)):
+            path = self.write_temp_file(data)
+
+            tracemalloc.start()
+            try:
+                text = tokenizer.read_file(path)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            # The text of ASCII or ISO-8859-1 input takes a byte per character
+            self.assertEqual(len(text), len(data) - data.startswith(codecs.BOM_UTF8) * 3)
+            self.assertTrue(peak < len(data) * limit, (len(data), peak))
+
+    def test_decode_data(self):
+        code = u"char c = '\u00e9';"
+
+        self.assertEqual(tokenizer.decode_data(code.encode('utf_8')), (code, 'utf-8'))
+        self.assertEqual(tokenizer.decode_data(codecs.BOM_UTF16_BE + code.encode('utf_16_be'),
+                                               encoding='cp1252'),
+                         (code, 'utf-16-be'))
+        self.assertEqual(tokenizer.decode_data(code.encode('cp1252'), encoding='cp1252'),
+                         (code, 'cp1252'))
+
+        # UTF-8 is given up on for ISO-8859-1 wherever it fails
+        data = b"int a;\n" * 10 + code.encode('iso-8859-1')
+        self.assertEqual(tokenizer.decode_data(data), (data.decode('iso-8859-1'), 'iso8859-1'))
+        data = code.encode('utf_8') + code.encode('iso-8859-1')
+        self.assertEqual(tokenizer.decode_data(data), (data.decode('iso-8859-1'), 'iso8859-1'))
+        self.assertEqual(tokenizer.decode_data(codecs.BOM_UTF8 + code.encode('utf_8')),
+                         (code, 'utf-8'))
+
+        with self.assertRaises(UnicodeDecodeError):
+            tokenizer.decode_data(code.encode('iso-8859-1'), encoding='utf_8')
+        self.assertEqual(tokenizer.decode_data(code.encode('iso-8859-1'), encoding='utf_8',
+                                               errors='replace'),
+                         (u"char c = '\ufffd';", 'utf-8'))
+
+    def test_decode_errors(self):
+        data = b"int a;\nchar c = '\xe9';"
+
+        with self.assertRaises(tokenizer.LexerError):
+            list(tokenizer.tokenize(data, encoding='utf_8'))
+
+        java_tokenizer = tokenizer.JavaTokenizer(data, ignore_errors=True, encoding='utf_8')
+        tokens = list(java_tokenizer.tokenize())
+
+        self.assertEqual(tokens[-2].value, u"'\ufffd'")
+        self.assertEqual(java_tokenizer.codec, 'utf-8')
+        self.assertEqual(java_tokenizer.diagnostics[0][:2], (17, 'decode'))
+
+        # A replacement character decoded from the input is not the error
+        data = u"String s = \"\ufffd\";\nchar c = '".encode('utf_16_le') + b"\x00\xd8';\x00"
+        java_tokenizer = tokenizer.JavaTokenizer(codecs.BOM_UTF16_LE + data, ignore_errors=True)
+        list(java_tokenizer.tokenize())
+
+        self.assertEqual(java_tokenizer.diagnostics[0][:2], (26, 'decode'))
+
+    def test_source_decoder(self):
+        code = u"class Caf\u00e9 { }"
+        data = codecs.BOM_UTF16_LE + code.encode('utf_16_le')
+
+        decoder = tokenizer.SourceDecoder()
+        text = u''.join(decoder.iterdecode(data[i:i + 1] for i in range(len(data))))
+        self.assertEqual((text, decoder.codec), (code, 'utf-16-le'))
+
+        decoder = tokenizer.SourceDecoder()
+        tokens = list(tokenizer.tokenize_stream(decoder.iterdecode([b"class A", b" { } // \xe9"])))
+        self.assertEqual(len(tokens), 4)
+        self.assertEqual(decoder.codec, 'iso8859-1')
+
 if __name__=="__main__":
     unittest.main()
@@ -1,4 +1,9 @@
+import array
+import bisect
+import codecs
+import mmap
 import re
+import string
 import unicodedata
 from collections import namedtuple
 
@@ -8,14 +13,129 @@ import six
 class LexerError(Exception):
     pass
 
+class ErrorLimitReached(LexerError):
+    """ Raised by a tokenizer to stop once it has found max_errors errors """
+
 Position = namedtuple('Position', ['line', 'column'])
 
+# Whitespace and comments between tokens, recorded when the tokenizer is given
+# a list for them. start and end are offsets into the input.
+Trivia = namedtuple('Trivia', ['kind', 'start', 'end'])
+
+WHITESPACE = 'whitespace'
+LINE_COMMENT = 'line_comment'
+BLOCK_COMMENT = 'block_comment'
+JAVADOC = 'javadoc'
+
+# An error found by a tokenizer. offset is the offset into the input at which
+# the token being read starts, code a key of JavaTokenizer.ERROR_MESSAGES and
+# char the text the error is about.
+Diagnostic = namedtuple('Diagnostic', ['offset', 'code', 'char'])
+
+@six.python_2_unicode_compatible
+class JavadocSpan(object):
+    """ A javadoc comment kept as its offsets into the data it was read from,
+    with its text only copied out when it is asked for. Spans compare equal to
+    their text.
+
+    """
+
+    __slots__ = ('data', 'start', 'end')
+
+    def __init__(self, data, start, end):
+        self.data = data
+        self.start = start
+        self.end = end
+
+    @property
+    def text(self):
+        return self.data[self.start:self.end]
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return 'JavadocSpan(%d, %d)' % (self.start, self.end)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __eq__(self, other):
+        if isinstance(other, JavadocSpan):
+            other = other.text
+
+        return self.text == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.text)
+
+class LineIndex(object):
+    """ Resolves offsets into the input of a tokenizer to positions, by the
+    offsets at which its lines start. The tokens sharing an index don't keep
+    the input alive through it.
+
+    """
+
+    __slots__ = ('starts',)
+
+    def __init__(self, starts):
+        self.starts = starts
+
+    def position(self, offset):
+        starts = self.starts
+        line = bisect.bisect_right(starts, offset)
+
+        return Position(line, offset - starts[line - 1] + 1)
+
+# Token classes indexed by their kind
+TOKEN_KINDS = []
+
+class MetaToken(type):
+    """ Assigns each token class an integer kind, its index in TOKEN_KINDS,
+    and gives the token classes of this module empty __slots__ unless they
+    declare their own so that tokens don't carry an instance dictionary.
+    Subclasses defined elsewhere keep one, as they may set other attributes.
+
+    """
+
+    def __new__(mcs, name, bases, dict):
+        if dict.get('__module__') == __name__:
+            dict.setdefault('__slots__', ())
+        dict['kind'] = len(TOKEN_KINDS)
+
+        cls = type.__new__(mcs, name, bases, dict)
+        TOKEN_KINDS.append(cls)
+
+        return cls
+
+@six.add_metaclass(MetaToken)
 class JavaToken(object):
-    def __init__(self, value, position=None, javadoc=None):
+    __slots__ = ('value', 'offset', '_position', 'javadoc')
+
+    def __init__(self, value, position=None, javadoc=None, offset=None):
         self.value = value
-        self.position = position
+        self.offset = offset
+        self._position = position
         self.javadoc = javadoc
 
+    @property
+    def position(self):
+        position = self._position
+
+        # Tokens from the tokenizer only have their position computed from
+        # their offset when it is asked for
+        if isinstance(position, LineIndex):
+            position = self._position = position.position(self.offset)
+
+        return position
+
+    @position.setter
+    def position(self, position):
+        self._position = position
+
     def __repr__(self):
         if self.position:
             return '%s "%s" line %d, position %d' % (
@@ -149,24 +269,166 @@ class JavaTokenizer(object):
 
     IDENT_PART_CATEGORIES = set(['Lu', 'Ll', 'Lt', 'Lm', 'Lo', 'Mc', 'Mn', 'Nd', 'Nl', 'Pc', 'Sc'])
 
-    def __init__(self, data, ignore_errors=False):
+    # The ASCII characters belonging to IDENT_START_CATEGORIES
+    IDENT_START_ASCII = frozenset(string.ascii_letters + '_$')
+
+    # Categories of non-ASCII characters are cached, shared by all tokenizers.
+    # The cache is emptied once it reaches CATEGORY_CACHE_SIZE entries
+    CATEGORY_CACHE_SIZE = 4096
+
+    category_cache = {}
+
+    # Digits as consumed by read_digits(), including its handling of a trailing
+    # 'l'/'L' (which also swallows an underscore directly preceding it). The
+    # lookaheads stop the regex engine from backtracking to a shorter match
+    DIGITS_PATTERN = (r'(?:_*[%(digits)s])*(?!_*[%(digits)s])'
+                      r'(?:[lL]|_(?=_*[lL])|(?!_*[lL]))')
+    DECIMAL_DIGITS_PATTERN = DIGITS_PATTERN % {'digits': '0-9'}
+    HEX_DIGITS_PATTERN = DIGITS_PATTERN % {'digits': '0-9a-fA-F'}
+
+    # read_digits() for each set of digits it is used with
+    DIGITS_MATCHERS = dict()
+
+    for digits in ('0123456789', '0123456789abcdefABCDEF', '01', '01234567'):
+        DIGITS_MATCHERS[digits] = re.compile(DIGITS_PATTERN % {'digits': digits}).match
+
+    del digits
+
+    # The longest prefix of a character or string literal without an illegal
+    # escape, by delimiter
+    STRING_PREFIX_MATCHERS = {
+        '"': re.compile(r'"[^"\\]*(?:\\[btnfru"\'\\0-7][^"\\]*)*').match,
+        "'": re.compile(r"'[^'\\]*(?:\\[btnfru\"'\\0-7][^'\\]*)*").match,
+        }
+
+    # A fraction or exponent with nothing after it is left to read_token(),
+    # which rejects it
+    EXPONENT_PATTERN = r'(?:[-+]|(?![-+]))(?!\Z)' + DECIMAL_DIGITS_PATTERN
+    DECIMAL_FLOAT_REST_PATTERN = (
+        r'(?:\.(?!\Z)' + DECIMAL_DIGITS_PATTERN + r'|(?!\.))'
+        r'(?:[eE]' + EXPONENT_PATTERN + r'|(?![eE]))'
+        r'[fFdD]?')
+
+    # Alternatives are listed in the order read_token() checks for them. Input
+    # which none of them matches is handed to read_token()
+    TOKEN_PATTERN = re.compile('|'.join([
+        r'(?P<whitespace>\s+)',
+        r'(?P<comment>//[^\n]*\n?|/\*.*?\*/)',
+        r'(?P<ellipsis>\.\.\.)',
+        r'(?P<annotation>@)',
+        r'(?P<dot_float>(?=\.[0-9])' + DECIMAL_FLOAT_REST_PATTERN + ')',
+        r'(?P<separator>[(){}\[\];,]|\.(?![0-9]|[^\x00-\x7f]))',
+        r'(?P<string>"[^"\\]*(?:\\[btnfru"\'\\0-7][^"\\]*)*"'
+        r'|\'[^\'\\]*(?:\\[btnfru"\'\\0-7][^\'\\]*)*\')',
+        r'(?P<hex_float>0[xX](?!\Z)' + HEX_DIGITS_PATTERN + r'(?=[.pP])'
+        r'(?:\.(?!\Z)' + HEX_DIGITS_PATTERN + r'|(?!\.))'
+        r'[pP]' + EXPONENT_PATTERN + r'[fFdD]?)',
+        r'(?P<hex>0[xX](?!\Z)' + HEX_DIGITS_PATTERN + r'(?![.pP]))',
+        r'(?P<binary>0[bB](?!\Z)' + DIGITS_PATTERN % {'digits': '01'} + ')',
+        r'(?P<octal>0(?=[0-7])' + DIGITS_PATTERN % {'digits': '0-7'} + ')',
+        r'(?P<decimal_float>(?!0[xXbB0-7])[0-9]' + DECIMAL_DIGITS_PATTERN
+        + r'(?=[.eEfFdD])' + DECIMAL_FLOAT_REST_PATTERN + ')',
+        r'(?P<decimal>(?!0[xXbB0-7])[0-9]' + DECIMAL_DIGITS_PATTERN
+        + r'(?![.eEfFdD]))',
+        r'(?P<identifier>[a-zA-Z_$][a-zA-Z0-9_$]*(?![a-zA-Z0-9_$]|[^\x00-\x7f]))',
+        r'(?P<operator>(?!/[/*])(?:%s))' % '|'.join(
+            re.escape(v) for v in sorted(Operator.VALUES, key=len, reverse=True)),
+        ]), re.DOTALL)
+
+    # Operators by their first character, longest first, so the first one
+    # found at a position is the longest operator there
+    OPERATOR_TABLE = dict()
+
+    for operator in sorted(Operator.VALUES, key=len, reverse=True):
+        OPERATOR_TABLE.setdefault(operator[0], []).append(operator)
+
+    del operator
+
+    TOKEN_GROUP_TYPES = {
+        'ellipsis': Operator,
+        'annotation': Annotation,
+        'dot_float': DecimalFloatingPoint,
+        'separator': Separator,
+        'string': String,
+        'hex_float': HexFloatingPoint,
+        'hex': HexInteger,
+        'binary': BinaryInteger,
+        'octal': OctalInteger,
+        'decimal_float': DecimalFloatingPoint,
+        'decimal': DecimalInteger,
+        'operator': Operator,
+        }
+
+    # The types of the keywords and literals which look like identifiers
+    IDENTIFIER_TYPES = dict()
+
+    for token_type in (Keyword, BasicType, Modifier, Boolean):
+        for value in token_type.VALUES:
+            IDENTIFIER_TYPES[value] = token_type
+
+    IDENTIFIER_TYPES['null'] = Null
+
+    del token_type, value
+
+    # Types of the tokens whose values are shared by all tokens of a tokenizer
+    # with the same text
+    NAME_TYPES = frozenset([Identifier, Keyword, BasicType, Modifier, Boolean, Null])
+
+    ERROR_MESSAGES = {
+        'decode': 'Could not decode input data',
+        'unterminated_literal': 'Unterminated character/string literal',
+        'illegal_escape': 'Illegal escape character',
+        'unterminated_comment': 'Unterminated block comment',
+        'invalid_hex_float': 'Invalid hex float literal',
+        'invalid_unicode_escape': 'Invalid unicode escape',
+        'invalid_token': 'Could not process token',
+        'too_many_errors': 'Too many errors',
+        }
+
+    def __init__(self, data, ignore_errors=False, trivia=None, max_errors=None,
+                 encoding=None, lazy_javadoc=False):
         self.data = data
         self.ignore_errors = ignore_errors
-        self.errors = []
 
-        # Rows and columns both start at 1
-        self.current_line = 1
-        self.start_of_line = -1
+        # Whether javadoc comments are kept as JavadocSpans into the data
+        # rather than copied out of it. This saves memory when the data is
+        # kept anyway, as the spans keep all of it alive.
+        self.lazy_javadoc = lazy_javadoc
+
+        # The codec to decode data with if it is bytes, unless it starts with a
+        # byte order mark, and the name of the codec it was decoded with
+        self.encoding = encoding
+        self.codec = None
+
+        # Errors found, as Diagnostics. When errors are ignored lexing stops
+        # after max_errors of them, if given.
+        self.diagnostics = []
+        self.max_errors = max_errors
 
-        self.operators = [set() for i in range(0, Operator.MAX_LEN)]
+        # The list of errors, to which the diagnostics are appended as
+        # LexerErrors when it is read, and how many have been
+        self.rendered_errors = []
+        self.rendered = 0
 
-        for v in Operator.VALUES:
-            self.operators[len(v) - 1].add(v)
+        # List to record whitespace and comments in, if any
+        self.trivia = trivia
 
         self.whitespace_consumer = re.compile(r'[^\s]')
+        self.ident_part_ascii_run = re.compile(r'[a-zA-Z0-9_$]*').match
 
         self.javadoc = None
 
+        # Identifier and keyword text, by itself
+        self.names = dict()
+
+        # The decoded input, before unicode escapes are translated
+        self.source = None
+
+        # Offsets into the translated data after which the shift in the
+        # columns introduced by unicode escapes changes, and those shifts
+        self.escape_offsets = []
+        self.escape_shifts = []
+
 
     def reset(self):
         self.i = 0
@@ -176,62 +438,69 @@ class JavaTokenizer(object):
         match = self.whitespace_consumer.search(self.data, self.i + 1)
 
         if not match:
-            self.i = self.length
-            return
-
-        i = match.start()
-
-        start_of_line = self.data.rfind('\n', self.i, i)
+            i = self.length
+        else:
+            i = match.start()
 
-        if start_of_line != -1:
-            self.start_of_line = start_of_line
-            self.current_line += self.data.count('\n', self.i, i)
+        if self.trivia is not None:
+            self.add_trivia(self.i, i)
 
         self.i = i
 
     def read_string(self):
-        delim = self.data[self.i]
+        data = self.data
+        delim = data[self.i]
+
+        # Skip the part of the literal without illegal escapes in one go, and
+        # the closing delimiter if it follows
+        j = self.STRING_PREFIX_MATCHERS[delim](data, self.i).end()
+
+        if j < self.length and data[j] == delim:
+            self.j = j + 1
+            return
 
+        # Otherwise step through the rest to report the error. After the
+        # prefix no octal escape is pending, so this starts in state 0
         state = 0
-        j = self.i + 1
         length = self.length
 
         while True:
             if j >= length:
-                self.error('Unterminated character/string literal')
-                break
+                self.error('unterminated_literal')
+                self.j = length
+                return
 
             if state == 0:
-                if self.data[j] == '\\':
+                if data[j] == '\\':
                     state = 1
-                elif self.data[j] == delim:
+                elif data[j] == delim:
                     break
 
             elif state == 1:
-                if self.data[j] in 'btnfru"\'\\':
+                if data[j] in 'btnfru"\'\\':
                     state = 0
-                elif self.data[j] in '0123':
+                elif data[j] in '0123':
                     state = 2
-                elif self.data[j] in '01234567':
+                elif data[j] in '01234567':
                     state = 3
                 else:
-                    self.error('Illegal escape character', self.data[j])
+                    self.error('illegal_escape', data[j])
 
             elif state == 2:
                 # Possibly long octal
-                if self.data[j] in '01234567':
+                if data[j] in '01234567':
                     state = 3
-                elif self.data[j] == '\\':
+                elif data[j] == '\\':
                     state = 1
-                elif self.data[j] == delim:
+                elif data[j] == delim:
                     break
 
             elif state == 3:
                 state = 0
 
-                if self.data[j] == '\\':
+                if data[j] == '\\':
                     state = 1
-                elif self.data[j] == delim:
+                elif data[j] == delim:
                     break
 
             j += 1
@@ -239,9 +508,9 @@ class JavaTokenizer(object):
         self.j = j + 1
 
     def try_operator(self):
-        for l in range(min(self.length - self.i, Operator.MAX_LEN), 0, -1):
-            if self.data[self.i:self.i + l] in self.operators[l - 1]:
-                self.j = self.i + l
+        for operator in self.OPERATOR_TABLE.get(self.data[self.i], ()):
+            if self.data.startswith(operator, self.i):
+                self.j = self.i + len(operator)
                 return True
         return False
 
@@ -258,18 +527,13 @@ class JavaTokenizer(object):
         elif accept_eof:
             i = self.length
         else:
-            self.error('Unterminated block comment')
-            partial_comment = self.data[self.i:]
-            self.i = self.length
-            return partial_comment
-
-        comment = self.data[self.i:i]
-        start_of_line = self.data.rfind('\n', self.i, i)
+            self.error('unterminated_comment')
+            i = self.length
 
-        if start_of_line != -1:
-            self.start_of_line = start_of_line
-            self.current_line += self.data.count('\n', self.i, i)
+        if self.trivia is not None:
+            self.add_trivia(self.i, i)
 
+        comment = self.data[self.i:i]
         self.i = i
 
         return comment
@@ -318,7 +582,7 @@ class JavaTokenizer(object):
         if self.j < len(self.data) and self.data[self.j] in 'pP':
             self.j = self.j + 1
         else:
-            self.error('Invalid hex float literal')
+            self.error('invalid_hex_float')
 
         if self.j < len(self.data) and self.data[self.j] in '-+':
             self.j = self.j + 1
@@ -333,22 +597,7 @@ class JavaTokenizer(object):
         return HexFloatingPoint
 
     def read_digits(self, digits):
-        tmp_i = 0
-        c = None
-
-        while self.j + tmp_i < len(self.data):
-            c = self.data[self.j + tmp_i]
-
-            if c in digits:
-                self.j += 1 + tmp_i
-                tmp_i = 0
-            elif c == '_':
-                tmp_i += 1
-            else:
-                break
-
-        if c in 'lL':
-            self.j += 1
+        self.j = self.DIGITS_MATCHERS[digits](self.data, self.j).end()
 
     def read_decimal_integer(self):
         self.j = self.i
@@ -367,16 +616,32 @@ class JavaTokenizer(object):
         self.read_digits('01234567')
 
     def read_integer_or_float(self, c, c_next):
-        if c == '0' and c_next in 'xX':
-            return self.read_hex_integer_or_float()
-        elif c == '0' and c_next in 'bB':
-            self.read_bin_integer()
-            return BinaryInteger
-        elif c == '0' and c_next in '01234567':
-            self.read_octal_integer()
-            return OctalInteger
+        # c_next is None for a digit at the end of the input
+        if c == '0' and c_next is not None:
+            if c_next in 'xX':
+                return self.read_hex_integer_or_float()
+            elif c_next in 'bB':
+                self.read_bin_integer()
+                return BinaryInteger
+            elif c_next in '01234567':
+                self.read_octal_integer()
+                return OctalInteger
+
+        return self.read_decimal_float_or_integer()
+
+    def add_trivia(self, i, j):
+        """ Record the whitespace or comment self.data[i:j] """
+
+        if self.data.startswith('/**', i):
+            kind = JAVADOC
+        elif self.data.startswith('//', i):
+            kind = LINE_COMMENT
+        elif self.data.startswith('/*', i):
+            kind = BLOCK_COMMENT
         else:
-            return self.read_decimal_float_or_integer()
+            kind = WHITESPACE
+
+        self.trivia.append(Trivia(kind, self.original_offset(i), self.original_offset(j)))
 
     def try_separator(self):
         if self.data[self.i] in Separator.VALUES:
@@ -385,53 +650,98 @@ class JavaTokenizer(object):
         return False
 
     def decode_data(self):
-        # Encodings to try in order
-        codecs = ['utf_8', 'iso-8859-1']
-
         # If data is already unicode don't try to redecode
         if isinstance(self.data, six.text_type):
             return self.data
 
-        for codec in codecs:
+        try:
+            data, self.codec = decode_data(self.data, self.encoding)
+
+        except UnicodeDecodeError as e:
+            char = repr(e.object[e.start:e.end])
+            data, self.codec = decode_data(self.data, self.encoding, 'replace')
+
+            # The error is reported at the first character replaced, which
+            # follows the text decoded from the bytes before the error
+            self.data = self.source = data
+            self.i = len(codecs.decode(e.object[:e.start], self.codec, 'replace'))
+
             try:
-                data = self.data.decode(codec)
-                return data
-            except UnicodeDecodeError:
-                pass
+                self.error('decode', char)
+            finally:
+                self.i = 0
+
+        return data
+
+    def unicode_category(self, c):
+        category = self.category_cache.get(c)
+
+        if category is None:
+            if len(self.category_cache) >= self.CATEGORY_CACHE_SIZE:
+                self.category_cache.clear()
+
+            category = unicodedata.category(c)
+            self.category_cache[c] = category
 
-        self.error('Could not decode input data')
+        return category
 
     def is_java_identifier_start(self, c):
-        return unicodedata.category(c) in self.IDENT_START_CATEGORIES
+        if c < u'\x80':
+            return c in self.IDENT_START_ASCII
+
+        return self.unicode_category(c) in self.IDENT_START_CATEGORIES
 
     def read_identifier(self):
-        self.j = self.i + 1
+        data = self.data
+        length = self.length
+        j = self.i + 1
 
-        while self.j < len(self.data) and unicodedata.category(self.data[self.j]) in self.IDENT_PART_CATEGORIES:
-            self.j += 1
+        while True:
+            # Skip over a run of ASCII identifier characters and only look up
+            # the category of whatever character follows it if it isn't ASCII
+            j = self.ident_part_ascii_run(data, j).end()
 
-        ident = self.data[self.i:self.j]
-        if ident in Keyword.VALUES:
-            token_type = Keyword
+            if (j < length and data[j] >= u'\x80' and
+                    self.unicode_category(data[j]) in self.IDENT_PART_CATEGORIES):
+                j += 1
+            else:
+                break
 
-            if ident in BasicType.VALUES:
-                token_type = BasicType
-            elif ident in Modifier.VALUES:
-                token_type = Modifier
+        self.j = j
 
-        elif ident in Boolean.VALUES:
-            token_type = Boolean
-        elif ident == 'null':
-            token_type = Null
-        else:
-            token_type = Identifier
+        return self.identifier_type(data[self.i:j])
 
-        return token_type
+    def identifier_type(self, ident):
+        return self.IDENTIFIER_TYPES.get(ident, Identifier)
 
     def pre_tokenize(self):
-        new_data = list()
         data = self.decode_data()
 
+        # Escapes are rare, so only translate them when there are any and
+        # otherwise leave the input as it is
+        self.source = data
+
+        if data.find('\\u') == -1:
+            self.data = data
+            self.length = len(data)
+            return
+
+        self.data, _ = self.translate_escapes(data)
+        self.length = len(self.data)
+
+    def translate_escapes(self, data, offset=0, translated=0, final=True):
+        """ Translate the unicode escapes in data, returning the result and the
+        length of data which was translated.
+
+        The shifts introduced by escapes are recorded in terms of offset, the
+        offset of data into the input, and translated, the length of the
+        translated input preceding it. Unless final is true, an escape which
+        may continue past the end of data is left untranslated.
+
+        """
+
+        new_data = list()
+
         i = 0
         j = 0
         length = len(data)
@@ -457,7 +767,9 @@ class JavaTokenizer(object):
 
                 if c == 'u':
                     state = MARKER_FOUND
-                    new_data.append(data[i:j - 1])
+                    marker = j - 1
+                    new_data.append(data[i:marker])
+                    translated += marker - i
                 else:
                     state = NONE
 
@@ -465,173 +777,1300 @@ class JavaTokenizer(object):
                 c = data[j]
 
                 if c != 'u':
+                    if not final and j + 4 > length:
+                        break
+
                     try:
                         escape_code = int(data[j:j+4], 16)
                     except ValueError:
-                        self.error('Invalid unicode escape', data[j:j+4])
+                        self.error('invalid_unicode_escape', data[j:j+4])
 
                     new_data.append(six.unichr(escape_code))
+                    translated += 1
 
                     i = j + 4
                     j = i
 
+                    # Everything following the escaped character is shifted
+                    # by the difference in length between the escape and it
+                    self.escape_offsets.append(translated)
+                    self.escape_shifts.append(offset + min(i, length) - translated)
+
                     state = NONE
 
                     continue
 
             j = j + 1
 
+        if final:
+            new_data.append(data[i:])
+            return ''.join(new_data), length
+
+        # Leave the escape being read for when more data is available
+        if state == ELIGIBLE:
+            new_data.append(data[i:j - 1])
+            return ''.join(new_data), j - 1
+
+        elif state == MARKER_FOUND:
+            return ''.join(new_data), marker
+
         new_data.append(data[i:])
+        return ''.join(new_data), length
 
-        self.data = ''.join(new_data)
-        self.length = len(self.data)
+    def original_offset(self, i):
+        """ Map an offset into the data being tokenized, which has had its unicode
+        escapes translated, to the corresponding offset into the input.
+
+        """
+
+        k = bisect.bisect_right(self.escape_offsets, i)
+
+        if k:
+            return i + self.escape_shifts[k - 1]
+
+        return i
+
+    def read_token(self):
+        """ Read the token starting at the current position and return its type.
+
+        Whitespace and comments are consumed without producing a token, as are
+        characters which can not be processed. None is returned in both cases.
+
+        """
+
+        c = self.data[self.i]
+        c_next = None
+        startswith = c
+
+        if self.i + 1 < self.length:
+            c_next = self.data[self.i + 1]
+            startswith = c + c_next
+
+        if c.isspace():
+            self.consume_whitespace()
+            return None
+
+        elif startswith in ("//", "/*"):
+            i = self.i
+            comment = self.read_comment()
+            if comment.startswith("/**"):
+                if self.lazy_javadoc:
+                    self.javadoc = JavadocSpan(self.data, i, self.i)
+                else:
+                    self.javadoc = comment
+            return None
+
+        elif startswith == '..' and self.try_operator():
+            # Ensure we don't mistake a '...' operator as a sequence of
+            # three '.' separators. This is done as an optimization instead
+            # of moving try_operator higher in the chain because operators
+            # aren't as common and try_operator is expensive
+            return Operator
+
+        elif c == '@':
+            self.j = self.i + 1
+            return Annotation
+
+        elif c == '.' and c_next and c_next.isdigit():
+            return self.read_decimal_float_or_integer()
+
+        elif self.try_separator():
+            return Separator
+
+        elif c in ("'", '"'):
+            self.read_string()
+            return String
+
+        elif c in '0123456789':
+            return self.read_integer_or_float(c, c_next)
+
+        elif self.is_java_identifier_start(c):
+            return self.read_identifier()
+
+        elif self.try_operator():
+            return Operator
+
+        else:
+            self.error('invalid_token', c)
+            self.i = self.i + 1
+            return None
+
+    def lex(self):
+        """ Yield the type of each token of the input in turn without creating
+        token objects.
+
+        While a type is being handled self.data[self.i:self.j] is the token's
+        text and self.javadoc is the javadoc comment preceding it, if any.
+
+        """
 
-    def tokenize(self):
         self.reset()
 
         # Convert unicode escapes
         self.pre_tokenize()
 
         while self.i < self.length:
-            token_type = None
+            token_type = self.read_token()
 
-            c = self.data[self.i]
-            c_next = None
-            startswith = c
+            if token_type is None:
+                continue
 
-            if self.i + 1 < self.length:
-                c_next = self.data[self.i + 1]
-                startswith = c + c_next
+            yield token_type
 
-            if c.isspace():
-                self.consume_whitespace()
-                continue
+            if self.javadoc:
+                self.javadoc = None
 
-            elif startswith in ("//", "/*"):
-                comment = self.read_comment()
-                if comment.startswith("/**"):
-                    self.javadoc = comment
-                continue
+            self.i = self.j
+
+    def lex_regex(self, resume=False):
+        """ Like lex(), but matching a single compiled alternation of all token
+        patterns instead of dispatching on one character at a time.
 
-            elif startswith == '..' and self.try_operator():
-                # Ensure we don't mistake a '...' operator as a sequence of
-                # three '.' separators. This is done as an optimization instead
-                # of moving try_operator higher in the chain because operators
-                # aren't as common and try_operator is expensive
-                token_type = Operator
+        The result is identical to that of lex(). Input which the pattern does
+        not match cleanly (non-ASCII identifiers, malformed literals,
+        unterminated comments, ...) is handed to read_token() so that both
+        engines report errors in the same way.
 
-            elif c == '@':
-                token_type = Annotation
-                self.j = self.i + 1
+        If resume is true lexing continues from the current state of the
+        tokenizer rather than from the start of the input.
 
-            elif c == '.' and c_next and c_next.isdigit():
-                token_type = self.read_decimal_float_or_integer()
+        """
 
-            elif self.try_separator():
-                token_type = Separator
+        if not resume:
+            self.reset()
 
-            elif c in ("'", '"'):
-                token_type = String
-                self.read_string()
+            # Convert unicode escapes
+            self.pre_tokenize()
 
-            elif c in '0123456789':
-                token_type = self.read_integer_or_float(c, c_next)
+        data = self.data
+        length = self.length
+        match = self.TOKEN_PATTERN.match
+        group_types = self.TOKEN_GROUP_TYPES
+        trivia = self.trivia
+
+        while self.i < length:
+            i = self.i
+            m = match(data, i)
 
-            elif self.is_java_identifier_start(c):
-                token_type = self.read_identifier()
+            if m is None:
+                token_type = self.read_token()
 
-            elif self.try_operator():
-                token_type = Operator
+                if token_type is None:
+                    continue
 
             else:
-                self.error('Could not process token', c)
-                self.i = self.i + 1
-                continue
+                group = m.lastgroup
+                j = m.end()
+
+                if group == 'whitespace':
+                    if trivia is not None:
+                        self.add_trivia(i, j)
+
+                    self.i = j
+                    continue
+
+                elif group == 'comment':
+                    if data.startswith('/**', i):
+                        if self.lazy_javadoc:
+                            self.javadoc = JavadocSpan(data, i, j)
+                        else:
+                            self.javadoc = data[i:j]
+
+                    if trivia is not None:
+                        self.add_trivia(i, j)
+
+                    self.i = j
+                    continue
+
+                elif group == 'identifier':
+                    token_type = self.identifier_type(data[i:j])
+
+                else:
+                    token_type = group_types[group]
+
+                self.j = j
+
+            yield token_type
+
+            if self.javadoc:
+                self.javadoc = None
+
+            self.i = self.j
+
+    def line_index(self):
+        """ A LineIndex for the data, once pre_tokenize() has translated it """
+
+        starts = line_offsets(self.data)
+
+        # Lines are those of the translated data, but offsets and columns are
+        # in terms of the input
+        if self.escape_offsets:
+            starts = [self.original_offset(i) for i in starts]
+
+        return LineIndex(starts)
+
+    def make_tokens(self, token_types):
+        lines = None
+        names = self.names
+        name_types = self.NAME_TYPES
+
+        try:
+            for token_type in token_types:
+                if lines is None:
+                    lines = self.line_index()
+
+                i = self.i
+
+                if self.escape_offsets:
+                    offset = self.original_offset(i)
+                else:
+                    offset = i
+
+                value = self.data[i:self.j]
+
+                if token_type in name_types:
+                    value = names.setdefault(value, value)
+
+                yield token_type(value, lines, self.javadoc, offset)
+
+        except ErrorLimitReached:
+            pass
+
+    def tokenize(self):
+        return self.make_tokens(self.lex())
+
+    def tokenize_regex(self):
+        """ Tokenize the input using lex_regex() rather than lex() """
+
+        return self.make_tokens(self.lex_regex())
+
+    def error(self, code, char=None):
+        if not char:
+            # Empty if the error is at the end of the input
+            char = self.data[self.j:self.j + 1]
+
+        diagnostic = Diagnostic(self.original_offset(self.i), code, char)
+
+        if not self.ignore_errors:
+            self.diagnostics.append(diagnostic)
+            raise self.render_errors()[-1]
+
+        if self.max_errors is not None and len(self.diagnostics) >= self.max_errors:
+            self.diagnostics.append(diagnostic._replace(code='too_many_errors'))
+            raise ErrorLimitReached()
+
+        self.diagnostics.append(diagnostic)
+
+    def error_message(self, diagnostic):
+        """ Render the message for a diagnostic, including the line it is on """
+
+        if self.source is None:
+            data = self.data
+        else:
+            data = self.source
+
+        i = diagnostic.offset
+
+        line_start = data.rfind('\n', 0, i) + 1
+        line_end = data.find('\n', i)
+        if line_end < 0:
+            line_end = len(data)
+        line = data[line_start:line_end].strip()
+
+        line_number = data.count('\n', 0, i) + 1
+
+        return u'%s at "%s", line %s: %s' % (self.ERROR_MESSAGES[diagnostic.code],
+                                              diagnostic.char, line_number, line)
+
+    def render_errors(self):
+        """ Append the diagnostics found since the last call to the list of
+        errors as LexerErrors, and return the list.
+
+        """
+
+        errors = self.rendered_errors
+
+        for diagnostic in self.diagnostics[self.rendered:]:
+            errors.append(LexerError(self.error_message(diagnostic)))
+
+        self.rendered = len(self.diagnostics)
+
+        return errors
+
+    @property
+    def errors(self):
+        """ The errors found, as a list of LexerErrors. Their messages are only
+        rendered when this is read, and only once. The list may be modified or
+        replaced, errors found later are appended to it.
+
+        """
+
+        return self.render_errors()
+
+    @errors.setter
+    def errors(self, errors):
+        self.rendered_errors = errors
+        self.rendered = len(self.diagnostics)
+
+class JavaStreamTokenizer(JavaTokenizer):
+    """ Tokenizes an iterable of text chunks rather than a single string.
+
+    Only the input from the start of the token being read onwards is kept in
+    memory. Tokens, comments and literals may span any number of chunks, and
+    the tokens produced are the same as those for the concatenated input.
+    The exception are character and string literals still open at the end
+    of a line, which Java doesn't allow. Rather than reading on through the
+    input for their end, they are reported as unterminated at the end of the
+    input read so far, and lexing carries on from there.
+
+    """
+
+    last_space = re.compile(r'.*\s', re.DOTALL).match
+
+    def __init__(self, chunks, ignore_errors=False, trivia=None, max_errors=None):
+        super(JavaStreamTokenizer, self).__init__(u'', ignore_errors, trivia,
+                                                  max_errors)
+
+        self.chunks = iter(chunks)
+        self.exhausted = False
+
+        # Input which has been read but not yet translated, as it ends in what
+        # may be the start of a unicode escape
+        self.pending = u''
+
+        # Length of the input and of the translated input preceding self.data
+        self.read = 0
+        self.offset = 0
+
+        # Offset of the last whitespace character in self.data. Tokens ending
+        # before it can not be extended by the input still to come.
+        self.limit = -1
+
+        # Positions are kept track of as the data they are in is discarded.
+        # Rows and columns both start at 1.
+        self.current_line = 1
+        self.start_of_line = -1
+
+    def pre_tokenize(self):
+        # The input is read and translated by read_more()
+        self.data = u''
+        self.length = 0
+
+    def read_more(self):
+        """ Discard the data preceding the current token and append the next
+        chunk of input. Returns False once the input is exhausted.
+
+        """
+
+        if self.exhausted:
+            return False
+
+        i = self.i
+
+        if i:
+            self.data = self.data[i:]
+            self.length -= i
+            self.offset += i
+            self.start_of_line -= i
+            self.limit -= i
+            self.i = 0
+            self.j = 0
+
+            # Only the shifts from the start of the current line onwards are
+            # needed to compute columns
+            k = bisect.bisect_right(self.escape_offsets,
+                                    self.offset + self.start_of_line + 1)
+
+            if k > 1:
+                del self.escape_offsets[:k - 1]
+                del self.escape_shifts[:k - 1]
+
+        chunk = next(self.chunks, None)
+
+        if chunk is None:
+            self.exhausted = True
+            data = self.pending
+        else:
+            data = self.pending + chunk
+
+        if data.find('\\u') == -1 and not data.endswith('\\'):
+            text = data
+            length = len(data)
+        else:
+            text, length = self.translate_escapes(data, self.read,
+                                                  self.offset + self.length,
+                                                  self.exhausted)
+
+        self.pending = data[length:]
+        self.read += length
+
+        self.data += text
+        self.length = len(self.data)
+
+        if self.exhausted:
+            self.limit = self.length
+        else:
+            m = self.last_space(text)
+
+            if m:
+                self.limit = self.length - len(text) + m.end() - 1
+
+        return True
+
+    def original_offset(self, i):
+        return super(JavaStreamTokenizer, self).original_offset(i + self.offset)
+
+    def escaped_position(self):
+        """ Position of the current token in terms of the input rather than
+        the translated data. Only needed when unicode escapes were translated.
+
+        """
 
-            position = Position(self.current_line, self.i - self.start_of_line)
-            token = token_type(self.data[self.i:self.j], position, self.javadoc)
-            yield token
+        # Columns count from the character after the line terminator
+        line_start = self.original_offset(self.start_of_line + 1)
+        column = self.original_offset(self.i) - line_start + 1
+
+        return Position(self.current_line, column)
+
+
+    def lex(self):
+        """ Like lex_regex(), reading more input whenever the current token may
+        extend past the end of the data read so far.
+
+        """
+
+        self.reset()
+        self.pre_tokenize()
+
+        match = self.TOKEN_PATTERN.match
+        group_types = self.TOKEN_GROUP_TYPES
+
+        while True:
+            i = self.i
+
+            if i >= self.length:
+                if self.read_more():
+                    continue
+                break
+
+            data = self.data
+            m = match(data, i)
+
+            if not self.exhausted:
+                if m is None and data[i] in '\'"':
+                    # Literals may contain whitespace, so they can only be
+                    # read by read_token() once they are complete. They can
+                    # not contain line terminators though, so one still open
+                    # at the end of a line is left to read_token() to report
+                    more = data.find('\n', i) == -1
+                elif m is None:
+                    # Comments likewise
+                    more = i >= self.limit or data.startswith('/*', i)
+                else:
+                    more = m.end() > self.limit
+
+                if more:
+                    self.read_more()
+                    continue
+
+            if m is None:
+                token_type = self.read_token()
+
+                if token_type is None:
+                    continue
+
+            else:
+                group = m.lastgroup
+                j = m.end()
+
+                if group == 'whitespace' or group == 'comment':
+                    start_of_line = data.rfind('\n', i, j)
+
+                    if start_of_line != -1:
+                        self.start_of_line = start_of_line
+                        self.current_line += data.count('\n', i, j)
+
+                    if group == 'comment' and data.startswith('/**', i):
+                        self.javadoc = data[i:j]
+
+                    if self.trivia is not None:
+                        self.add_trivia(i, j)
+
+                    self.i = j
+                    continue
+
+                elif group == 'identifier':
+                    token_type = self.identifier_type(data[i:j])
+
+                else:
+                    token_type = group_types[group]
+
+                self.j = j
+
+            yield token_type
 
             if self.javadoc:
                 self.javadoc = None
 
+            # Literals are lexed even when they contain line terminators
+            if token_type is String:
+                start_of_line = self.data.rfind('\n', self.i, self.j)
+
+                if start_of_line != -1:
+                    self.start_of_line = start_of_line
+                    self.current_line += self.data.count('\n', self.i, self.j)
+
             self.i = self.j
 
-    def error(self, message, char=None):
-        # Provide additional information in the errors message
+    lex_regex = lex
+
+    def make_tokens(self, token_types):
+        names = self.names
+        name_types = self.NAME_TYPES
+
+        try:
+            for token_type in token_types:
+                if self.escape_offsets:
+                    position = self.escaped_position()
+                    offset = self.original_offset(self.i)
+                else:
+                    position = Position(self.current_line, self.i - self.start_of_line)
+                    offset = self.offset + self.i
+
+                value = self.data[self.i:self.j]
+
+                if token_type in name_types:
+                    value = names.setdefault(value, value)
+
+                yield token_type(value, position, self.javadoc, offset)
+
+        except ErrorLimitReached:
+            pass
+
+    def error(self, code, char=None):
+        try:
+            super(JavaStreamTokenizer, self).error(code, char)
+        finally:
+            # The data is discarded as it is consumed, so messages can only be
+            # rendered straight away
+            self.render_errors()
+
+    def error_message(self, diagnostic):
         line_start = self.data.rfind('\n', 0, self.i) + 1
         line_end = self.data.find('\n', self.i)
+        if line_end < 0:
+            line_end = len(self.data)
         line = self.data[line_start:line_end].strip()
 
-        line_number = self.current_line
+        return u'%s at "%s", line %s: %s' % (self.ERROR_MESSAGES[diagnostic.code],
+                                              diagnostic.char, self.current_line, line)
 
-        if not char:
-            char = self.data[self.j]
+def tokenize(code, ignore_errors=False, regex=False, trivia=None, max_errors=None,
+             encoding=None, lazy_javadoc=False):
+    tokenizer = JavaTokenizer(code, ignore_errors, trivia, max_errors, encoding,
+                              lazy_javadoc)
 
-        message = u'%s at "%s", line %s: %s' % (message, char, line_number, line)
-        error = LexerError(message)
-        self.errors.append(error)
+    if regex:
+        return tokenizer.tokenize_regex()
 
-        if not self.ignore_errors:
-            raise error
+    return tokenizer.tokenize()
 
-def tokenize(code, ignore_errors=False):
-    tokenizer = JavaTokenizer(code, ignore_errors)
+# Byte order marks and their codecs. The UTF-32 marks begin with the UTF-16
+# ones so they must be checked first.
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf_32_le'),
+    (codecs.BOM_UTF32_BE, 'utf_32_be'),
+    (codecs.BOM_UTF8, 'utf_8'),
+    (codecs.BOM_UTF16_LE, 'utf_16_le'),
+    (codecs.BOM_UTF16_BE, 'utf_16_be'),
+]
+
+def detect_bom(data):
+    """ Return the codec named by the byte order mark at the start of data and
+    the length of the mark, or (None, 0) if there is no mark.
+
+    """
+
+    for bom, codec in BYTE_ORDER_MARKS:
+        if data[:len(bom)] == bom:
+            return codec, len(bom)
+
+    return None, 0
+
+class SourceDecoder(object):
+    """ Incrementally decodes the bytes of a Java source.
+
+    A byte order mark at the start of the input takes precedence over
+    encoding. Without either the input is decoded as UTF-8, switching to
+    ISO-8859-1 at the first byte which is not valid UTF-8 provided the input
+    decoded before it is all ASCII, and so reads the same in both. errors is
+    the error handler of the codec once it is settled, e.g. 'strict' to raise
+    a UnicodeDecodeError or 'replace' to decode leniently.
+
+    codec is the name of the codec in use, or None until it is known.
+
+    """
+
+    def __init__(self, encoding=None, errors='strict'):
+        self.encoding = encoding
+        self.errors = errors
+        self.codec = None
+        self.decoder = None
+
+        # Input held back until it is long enough to hold a byte order mark
+        self.head = b''
+
+        # Whether the codec may still change from UTF-8 to ISO-8859-1
+        self.fallback = False
+
+    def start(self, data):
+        codec, skip = detect_bom(data)
+
+        if codec is None:
+            codec = self.encoding
+
+        if codec is None:
+            codec = 'utf_8'
+            self.fallback = True
+
+        self.codec = codecs.lookup(codec).name
+        self.decoder = codecs.getincrementaldecoder(codec)(
+            'strict' if self.fallback else self.errors)
+
+        return data[skip:]
+
+    def decode(self, data, final=False):
+        if self.decoder is None:
+            if self.head:
+                data = self.head + data
+
+            if len(data) < 4 and not final:
+                self.head = bytes(data)
+                return u''
+
+            self.head = b''
+            data = self.start(data)
+
+        if not self.fallback:
+            return self.decoder.decode(data, final)
+
+        buffered = self.decoder.getstate()[0]
+
+        try:
+            text = self.decoder.decode(data, final)
+
+        except UnicodeDecodeError:
+            # All text so far has been ASCII, only the bytes held back by the
+            # decoder and the new ones need to be decoded again
+            self.fallback = False
+            self.codec = codecs.lookup('iso-8859-1').name
+            self.decoder = codecs.getincrementaldecoder('iso-8859-1')(self.errors)
+
+            return self.decoder.decode(buffered + data, final)
+
+        # Only ASCII decodes to as many characters as it has bytes
+        consumed = len(buffered) + len(data) - len(self.decoder.getstate()[0])
+
+        if len(text) != consumed:
+            self.fallback = False
+            self.decoder.errors = self.errors
+
+        return text
+
+    def iterdecode(self, chunks):
+        """ Decode an iterable of byte chunks, e.g. a file opened in binary
+        mode, into text chunks.
+
+        """
+
+        for chunk in chunks:
+            text = self.decode(chunk)
+
+            if text:
+                yield text
+
+        text = self.decode(b'', True)
+
+        if text:
+            yield text
+
+def decode_data(data, encoding=None, errors='strict'):
+    """ Decode the bytes of a Java source, returning the text and the name of
+    the codec used.
+
+    A byte order mark at the start of data takes precedence over encoding.
+    Without either data is decoded as UTF-8, or as ISO-8859-1 if it is not
+    valid UTF-8. errors is the error handler of a codec given by a byte order
+    mark or encoding.
+
+    data, which may be any object supporting the buffer protocol such as a
+    memory map, is decoded in one go without being copied, so only the text
+    is held in memory besides it. Only when UTF-8 is given up on does the
+    UnicodeDecodeError hold a copy of data for a moment.
+
+    """
+
+    codec, skip = detect_bom(data)
+
+    if codec is None:
+        codec = encoding
+
+    if codec is not None:
+        # A view skips the byte order mark without copying data
+        view = memoryview(data)[skip:]
+
+        try:
+            text = codecs.decode(view, codec, errors)
+        finally:
+            view.release()
+
+        return text, codecs.lookup(codec).name
+
+    try:
+        return codecs.decode(data, 'utf_8'), codecs.lookup('utf_8').name
+    except UnicodeDecodeError:
+        # The error holds a copy of data, which is let go of before decoding
+        # it again
+        pass
+
+    return codecs.decode(data, 'iso-8859-1'), codecs.lookup('iso-8859-1').name
+
+def read_file(path, encoding=None):
+    """ Read and decode a Java source file.
+
+    The file is memory mapped and decoded straight from the mapping, so only
+    the decoded text is kept in memory. The codec is chosen as by
+    decode_data().
+
+    """
+
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped
+            return u''
+
+    try:
+        text, _ = decode_data(data, encoding)
+    except UnicodeDecodeError as e:
+        raise LexerError('Could not decode %s as %s' % (path, e.encoding))
+    finally:
+        data.close()
+
+    return text
+
+def tokenize_file(path, ignore_errors=False, regex=False, encoding=None,
+                  trivia=None, max_errors=None, lazy_javadoc=False):
+    return tokenize(read_file(path, encoding), ignore_errors, regex, trivia,
+                    max_errors, lazy_javadoc=lazy_javadoc)
+
+def tokenize_stream(chunks, ignore_errors=False, trivia=None, max_errors=None):
+    """ Tokenize an iterable of text chunks, e.g. a file opened in text mode """
+
+    tokenizer = JavaStreamTokenizer(chunks, ignore_errors, trivia, max_errors)
     return tokenizer.tokenize()
 
-def reformat_tokens(tokens):
+def line_offsets(code):
+    """ Offsets at which the lines of code start """
+
+    return [0] + [m.end() for m in re.finditer('\n', code)]
+
+def retokenize(code, tokens, offset, deleted, inserted, ignore_errors=False):
+    """ Tokenize code after an edit, reusing its tokens from before the edit.
+
+    tokens are the tokens of code, and the edit replaces the deleted characters
+    of code at offset with the text inserted. Lexing restarts at the last token
+    before the edit which follows whitespace or a comment, and stops once it
+    reaches a token past the edit which starts where an old token did. The old
+    tokens from there on are reused, with their offsets shifted.
+
+    Returns a list of the tokens of the edited code.
+
+    """
+
+    tokens = list(tokens)
+    new_code = code[:offset] + inserted + code[offset + deleted:]
+
+    # Offsets into the input can not be lexed from when escapes are translated
+    if code.find('\\u') != -1 or new_code.find('\\u') != -1:
+        return list(tokenize(new_code, ignore_errors))
+
+    # The last token starting at or before the edit
+    lo = 0
+    hi = len(tokens)
+
+    while lo < hi:
+        mid = (lo + hi) // 2
+
+        if tokens[mid].offset <= offset:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    k = lo - 1
+
+    # Tokens directly following another may have been lexed differently had
+    # the preceding one been different
+    while k > 0 and tokens[k].offset == tokens[k - 1].offset + len(tokens[k - 1].value):
+        k -= 1
+
+    tokenizer = JavaTokenizer(new_code, ignore_errors)
+    tokenizer.reset()
+    tokenizer.pre_tokenize()
+
+    if k > 0:
+        tokenizer.i = tokens[k].offset
+        tokenizer.javadoc = tokens[k].javadoc
+    else:
+        k = 0
+
+    new_tokens = tokens[:k]
+
+    edit_end = offset + len(inserted)
+    shift = len(inserted) - deleted
+    m = k
+
+    for token in tokenizer.make_tokens(tokenizer.lex_regex(resume=True)):
+        i = token.offset
+
+        if i >= edit_end:
+            while m < len(tokens) and tokens[m].offset < i - shift:
+                m += 1
+
+            if m == len(tokens):
+                # Nothing left to synchronise with
+                edit_end = len(new_code) + 1
+
+            elif tokens[m].offset == i - shift and tokens[m].javadoc == token.javadoc:
+                break
+
+        new_tokens.append(token)
+
+    else:
+        return new_tokens
+
+    # The rest of the input is unchanged, so are the tokens lexed from it. They
+    # only move by the length of the edit, and share the index of the lines of
+    # the new code with the tokens just lexed.
+    lines = token._position
+
+    for token in tokens[m:]:
+        new_tokens.append(type(token)(token.value, lines, token.javadoc,
+                                      token.offset + shift))
+
+    return new_tokens
+
+class TokenArrays(object):
+    """ The tokens of a source as parallel arrays instead of token objects.
+
+    For each token, kinds holds its kind (an index into TOKEN_KINDS), starts
+    and ends its offsets into source, and lines and columns its position.
+
+    """
+
+    def __init__(self, source, kinds, starts, ends, lines, columns):
+        self.source = source
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.lines = lines
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def text(self, index):
+        """ The source text of a token. Unlike a token's value this has not
+        had its unicode escapes translated.
+
+        """
+
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def token_type(self, index):
+        return TOKEN_KINDS[self.kinds[index]]
+
+def tokenize_to_arrays(code, ignore_errors=False, as_numpy=False):
+    """ Tokenize code into a TokenArrays without creating any token objects.
+
+    The arrays are array.array instances unless as_numpy is true, in which case
+    they are converted (without copying) to NumPy arrays.
+
+    """
+
+    tokenizer = JavaTokenizer(code, ignore_errors)
+
+    kinds = array.array('H')
+    starts = array.array('i')
+    ends = array.array('i')
+    lines = array.array('i')
+    columns = array.array('i')
+
+    line_index = None
+
+    for token_type in tokenizer.lex_regex():
+        if line_index is None:
+            line_index = tokenizer.line_index()
+
+        if tokenizer.escape_offsets:
+            start = tokenizer.original_offset(tokenizer.i)
+            end = tokenizer.original_offset(tokenizer.j)
+        else:
+            start = tokenizer.i
+            end = tokenizer.j
+
+        line, column = line_index.position(start)
+
+        kinds.append(token_type.kind)
+        starts.append(start)
+        ends.append(end)
+        lines.append(line)
+        columns.append(column)
+
+    if as_numpy:
+        import numpy
+
+        kinds = numpy.frombuffer(kinds, dtype=numpy.uint16)
+        starts, ends, lines, columns = [
+            numpy.frombuffer(a, dtype=numpy.intc) for a in (starts, ends, lines, columns)]
+
+    return TokenArrays(tokenizer.source, kinds, starts, ends, lines, columns)
+
+ScanStats = namedtuple('ScanStats', ['lines', 'code_lines', 'comment_lines',
+                                     'blank_lines', 'tokens', 'token_types',
+                                     'keywords', 'operators'])
+
+class StatsTokenizer(JavaTokenizer):
+    """ Tokenizer for scan_stats(), recording where comments are rather than
+    all whitespace and comments.
+
+    """
+
+    def __init__(self, data, ignore_errors=False):
+        super(StatsTokenizer, self).__init__(data, ignore_errors, trivia=[])
+
+    def add_trivia(self, i, j):
+        if self.data[i] == '/':
+            self.trivia.append((i, j))
+
+def scan_stats(code, ignore_errors=False):
+    """ Count the lines and tokens of code without creating any token objects.
+
+    Returns a ScanStats with the number of lines, of lines with code, with
+    comments and with neither, the number of tokens, and dicts counting
+    tokens by type name, keywords by value and operators by value. A final
+    newline does not start another line.
+
+    """
+
+    tokenizer = StatsTokenizer(code, ignore_errors)
+    tokenizer.reset()
+    tokenizer.pre_tokenize()
+
+    data = tokenizer.data
+    starts = line_offsets(data)
+
+    if data.endswith('\n') or not data:
+        starts.pop()
+
+    # Lines with code or comments, flagged with 1 and 2 respectively
+    flags = bytearray(len(starts))
+    line = 0
+
+    # Sentinel, so there always is a line following the current one
+    starts.append(len(data) + 1)
+
+    types = dict.fromkeys(TOKEN_KINDS, 0)
+    keyword_types = frozenset([Keyword, BasicType, Modifier])
+    keywords = dict()
+    operators = dict()
+
+    for token_type in tokenizer.lex_regex(resume=True):
+        types[token_type] += 1
+
+        i = tokenizer.i
+        j = tokenizer.j
+
+        if token_type in keyword_types:
+            value = data[i:j]
+            keywords[value] = keywords.get(value, 0) + 1
+        elif token_type is Operator:
+            value = data[i:j]
+            operators[value] = operators.get(value, 0) + 1
+
+        while starts[line + 1] <= i:
+            line += 1
+
+        flags[line] |= 1
+
+        # String literals may span lines
+        while starts[line + 1] < j:
+            line += 1
+            flags[line] |= 1
+
+    for i, j in tokenizer.trivia:
+        first = bisect.bisect_right(starts, i) - 1
+        last = bisect.bisect_right(starts, j - 1) - 1
+
+        for line in range(first, min(last + 1, len(flags))):
+            flags[line] |= 2
+
+    code_lines = 0
+    comment_lines = 0
+    blank_lines = 0
+
+    for flag in flags:
+        if flag & 1:
+            code_lines += 1
+        if flag & 2:
+            comment_lines += 1
+        if not flag:
+            blank_lines += 1
+
+    return ScanStats(len(flags), code_lines, comment_lines, blank_lines,
+                     sum(types.values()),
+                     dict((t.__name__, n) for t, n in types.items() if n),
+                     keywords, operators)
+
+# Spans of input within which a newline does not separate tokens: comments and
+# character and string literals. Literals the tokenizer would reject are
+# matched leniently, as chunks containing them are not used.
+SPLIT_BARRIERS = re.compile(r'//[^\n]*|/\*.*?(?:\*/|\Z)'
+                            r'|"(?:[^"\\]|\\.)*(?:"|\Z)'
+                            r"|'(?:[^'\\]|\\.)*(?:'|\Z)", re.DOTALL)
+
+def split_points(code, size):
+    """ Offsets at which code can be split into chunks of at least size
+    characters which can be tokenized independently of each other.
+
+    Each offset follows a newline which is not within a comment or literal.
+
+    """
+
+    starts = []
+    ends = []
+
+    for m in SPLIT_BARRIERS.finditer(code):
+        starts.append(m.start())
+        ends.append(m.end())
+
+    points = []
+    i = size
+
+    while i < len(code):
+        # A newline ending the input would leave an empty chunk
+        i = code.find('\n', i, len(code) - 1)
+
+        if i == -1:
+            break
+
+        k = bisect.bisect_right(starts, i) - 1
+
+        if k >= 0 and ends[k] > i:
+            i = ends[k]
+            continue
+
+        i += 1
+        points.append(i)
+        i += size
+
+    return points
+
+def lex_chunk(chunk):
+    """ Lex a chunk of input in a worker of tokenize_parallel(). Returns the
+    kinds and offsets of its tokens, the javadoc comments of its tokens by
+    index, the javadoc comment following the last token, if any, and the
+    number of errors found.
+
+    """
+
+    tokenizer = JavaTokenizer(chunk, ignore_errors=True)
+
+    kinds = array.array('H')
+    starts = array.array('i')
+    ends = array.array('i')
+    javadocs = []
+
+    for token_type in tokenizer.lex_regex():
+        if tokenizer.javadoc is not None:
+            javadocs.append((len(kinds), tokenizer.javadoc))
+
+        kinds.append(token_type.kind)
+        starts.append(tokenizer.i)
+        ends.append(tokenizer.j)
+
+    return kinds, starts, ends, javadocs, tokenizer.javadoc, len(tokenizer.diagnostics)
+
+def tokenize_parallel(code, ignore_errors=False, processes=None, chunk_size=1 << 18,
+                      pool=None):
+    """ Tokenize code split into chunks of about chunk_size characters, lexing
+    the chunks on a pool of processes.
+
+    The pool is a multiprocessing.Pool, created with the given number of
+    processes if pool is None. The result is the same list of tokens as
+    tokenize() produces. Input with unicode escapes or which is too small to
+    split is tokenized in this process, as is input with errors, once they
+    have been found.
+
+    """
+
+    tokenizer = JavaTokenizer(code, ignore_errors)
+    tokenizer.reset()
+    tokenizer.pre_tokenize()
+
+    data = tokenizer.data
+
+    # Escapes may stand for newlines and quotes which a split would not see
+    if tokenizer.source.find('\\u') == -1:
+        points = split_points(data, chunk_size)
+    else:
+        points = []
+
+    if not points:
+        return list(tokenizer.make_tokens(tokenizer.lex_regex(resume=True)))
+
+    bounds = [0] + points
+    chunks = [data[i:j] for i, j in zip(bounds, points + [len(data)])]
+
+    if pool is None:
+        # Imported here as it slows down importing javalang noticeably
+        import multiprocessing
+
+        own_pool = multiprocessing.Pool(processes)
+
+        try:
+            results = own_pool.map(lex_chunk, chunks)
+        finally:
+            own_pool.close()
+            own_pool.join()
+    else:
+        results = pool.map(lex_chunk, chunks)
+
+    if any(result[-1] for result in results):
+        return list(tokenizer.make_tokens(tokenizer.lex_regex(resume=True)))
+
+    lines = tokenizer.line_index()
+    names = tokenizer.names
+    name_types = JavaTokenizer.NAME_TYPES
+
+    tokens = []
+    javadoc = None
+
+    for base, (kinds, starts, ends, javadocs, last_javadoc, _) in zip(bounds, results):
+        javadocs = dict(javadocs)
+
+        for index in range(len(kinds)):
+            token_type = TOKEN_KINDS[kinds[index]]
+            offset = base + starts[index]
+            value = data[offset:base + ends[index]]
+
+            if token_type in name_types:
+                value = names.setdefault(value, value)
+
+            # A javadoc comment at the end of a chunk belongs to the first
+            # token of the next chunk with a token
+            tokens.append(token_type(value, lines, javadocs.get(index, javadoc), offset))
+            javadoc = None
+
+        if last_javadoc is not None:
+            javadoc = last_javadoc
+
+    return tokens
+
+class Indentation(dict):
+    """ Newlines followed by indentation, by the width of the indentation """
+
+    def __missing__(self, width):
+        newline = self[width] = '\n' + ' ' * width
+        return newline
+
+def write_reformatted_tokens(tokens, out, buffer_size=4096):
+    """ Write tokens to the text file-like object out, formatted as by
+    reformat_tokens(). tokens may be any iterable, including a generator,
+    which is consumed one token at a time. Output is written in batches of
+    about buffer_size fragments.
+
+    """
+
     indent = 0
     closed_block = False
     ident_last = False
 
+    newlines = Indentation()
+
+    # Whether tokens of each class are words or operators. isinstance() takes
+    # about twice as long, as token classes have a metaclass
+    token_classes = dict()
+
     output = list()
+    append = output.append
 
     for token in tokens:
+        value = token.value
+        token_class = token_classes.get(type(token))
+
+        if token_class is None:
+            token_class = token_classes[type(token)] = (
+                issubclass(type(token), (Literal, Keyword, Identifier)),
+                issubclass(type(token), Operator))
+
+        word, operator = token_class
+
         if closed_block:
             closed_block = False
             indent -= 4
 
-            output.append('\n')
-            output.append(' ' * indent)
-            output.append('}')
+            append(newlines[indent])
+            append('}')
 
-            if isinstance(token, (Literal, Keyword, Identifier)):
-                output.append('\n')
-                output.append(' ' * indent)
+            if word:
+                append(newlines[indent])
 
-        if token.value == '{':
+        if value == '{':
             indent += 4
-            output.append(' {\n')
-            output.append(' ' * indent)
+            append(' {')
+            append(newlines[indent])
 
-        elif token.value == '}':
+        elif value == '}':
             closed_block = True
 
-        elif token.value == ',':
-            output.append(', ')
+        elif value == ',':
+            append(', ')
 
-        elif isinstance(token, (Literal, Keyword, Identifier)):
+        elif word:
             if ident_last:
                 # If the last token was a literla/keyword/identifer put a space in between
-                output.append(' ')
-            ident_last = True
-            output.append(token.value)
+                append(' ')
+            append(value)
 
-        elif isinstance(token, Operator):
-            output.append(' ' + token.value + ' ')
+        elif operator:
+            append(' ')
+            append(value)
+            append(' ')
 
-        elif token.value == ';':
-            output.append(';\n')
-            output.append(' ' * indent)
+        elif value == ';':
+            append(';')
+            append(newlines[indent])
 
         else:
-            output.append(token.value)
+            append(value)
+
+        ident_last = word
 
-        ident_last = isinstance(token, (Literal, Keyword, Identifier))
+        if len(output) >= buffer_size:
+            out.write(''.join(output))
+            del output[:]
 
     if closed_block:
-        output.append('\n}')
+        append('\n}')
 
-    output.append('\n')
+    append('\n')
+
+    out.write(''.join(output))
+
+def reformat_tokens(tokens):
+    output = six.StringIO()
+    write_reformatted_tokens(tokens, output)
 
-    return ''.join(output)
+    return output.getvalue()
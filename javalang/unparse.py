@@ -282,6 +282,8 @@ class Generator():
     def keyword(self, node):
         return node.value
 
+    super_qualifier = keyword
+
     def interface_declaration(self, node):
         result = '\ninterface %s\n{\n' % node.name
         self.indent += 1